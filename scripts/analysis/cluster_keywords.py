@@ -1,35 +1,39 @@
-from collections import defaultdict, Counter
+from collections import Counter
 from typing import Any, cast
 
-def cluster_keywords(df, column="word_list", n_clusters=6, return_tokens=False):
+def _store_matrix(token_store, fields, stop_words, with_tokens=True):
     """
-    Clusters keywords from a dataframe column containing token lists.
+    Document-term counts from a TokenStore, laid out like CountVectorizer's
+    output (terms sorted), without turning tokens back into strings first.
+    The token lists are only built `with_tokens`.
+    """
+    import numpy as np
+    from scipy.sparse import csr_matrix
 
-    Parameters:
-        df (pd.DataFrame): Input dataframe with tokenized keyword lists.
-        column (str): Column name containing token lists.
-        n_clusters (int): Number of clusters to generate.
-        return_tokens (bool): Whether to return the filtered token lists.
+    ids, offsets = token_store.select(fields, exclude=stop_words)
+    vocab = np.array(token_store.vocab, dtype=object)
+    used = np.unique(ids)
+    order = used[np.argsort(vocab[used])]
+    column_of = np.zeros(len(vocab), dtype=np.int64)
+    column_of[order] = np.arange(len(order))
 
-    Returns:
-        clustered (dict): Cluster ID → list of (keyword, count) tuples.
-        filtered_lists (list): List of filtered token lists (if return_tokens=True).
-    """
-    # Heavy imports deferred to function scope so importing this module
-    # doesn't pull large dependencies into the global import path.
-    from sklearn.feature_extraction.text import CountVectorizer, ENGLISH_STOP_WORDS
-    from sklearn.cluster import KMeans
+    X = csr_matrix(
+        (np.ones(len(ids), dtype=np.int64), column_of[ids], offsets),
+        shape=(len(token_store), len(order)),
+    )
+    X.sum_duplicates()
+    if not with_tokens:
+        return X, vocab[order], None
+    words = vocab[ids].tolist()
+    filtered_lists = [words[offsets[i]:offsets[i + 1]] for i in range(len(token_store))]
+    return X, vocab[order], filtered_lists
 
-    # Ensure stopwords are available
-    try:
-        from nltk.corpus import stopwords
-        _ = stopwords.words("english")
-    except Exception:
-        import nltk
-        nltk.download("stopwords")
-        from nltk.corpus import stopwords
+def _keyword_matrix(df, column, token_store, fields, stop_words, with_tokens=True):
+    """Document-term counts, terms and stopword-filtered token lists."""
+    from sklearn.feature_extraction.text import CountVectorizer
 
-    stop_words = set(stopwords.words("english")) | ENGLISH_STOP_WORDS
+    if token_store is not None:
+        return _store_matrix(token_store, fields, stop_words, with_tokens)
 
     # Use pre-cleaned token lists from df[column]
     keyword_lists = df[column].tolist()
@@ -48,30 +52,330 @@ def cluster_keywords(df, column="word_list", n_clusters=6, return_tokens=False):
         lowercase=False
     )
     X = vectorizer.fit_transform(filtered_lists)
-    terms = vectorizer.get_feature_names_out()
+    return X, vectorizer.get_feature_names_out(), filtered_lists
+
+# Terms kept per cluster
+TOP_TERMS = 15
+
+def _top_terms(counts, scores, k=TOP_TERMS):
+    """
+    Column indices of the `k` highest-scoring terms present in each row of
+    `counts` (a clusters x terms CSR matrix), best first; ties go to the
+    earlier column.
+    """
+    import numpy as np
+
+    top = []
+    for row in range(counts.shape[0]):
+        present = counts.indices[counts.indptr[row]:counts.indptr[row + 1]]
+        row_scores = scores[row, present] if scores.ndim == 2 else scores[present]
+        if len(present) > k:
+            keep = np.argpartition(-row_scores, k - 1)[:k]
+            # Bring back every term tied with the k-th, so the tie-break is stable
+            keep = np.flatnonzero(row_scores >= row_scores[keep].min())
+            present, row_scores = present[keep], row_scores[keep]
+        top.append(present[np.lexsort((present, -row_scores))][:k])
+    return top
+
+def cluster_term_counts(X, labels, n_clusters):
+    """Clusters x terms counts: a label-indicator matrix times `X`."""
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    indicator = csr_matrix(
+        (np.ones(len(labels), dtype=X.dtype), (labels, np.arange(len(labels)))),
+        shape=(n_clusters, len(labels)),
+    )
+    counts = (indicator @ X).tocsr()
+    counts.sort_indices()
+    return counts
+
+def ctfidf(counts):
+    """
+    Class-based TF-IDF of a clusters x terms count matrix: in-cluster term
+    frequency (normalized by cluster size in tokens) times
+    log(1 + average tokens per cluster / corpus frequency of the term).
+    """
+    import numpy as np
+
+    counts = counts.astype(np.float64)
+    cluster_tokens = np.asarray(counts.sum(axis=1)).ravel()
+    term_totals = np.asarray(counts.sum(axis=0)).ravel()
+    idf = np.log1p(cluster_tokens.mean() / np.maximum(term_totals, 1))
+    tf = counts.multiply(1 / np.maximum(cluster_tokens, 1)[:, None])
+    return tf.multiply(idf).tocsr()
+
+def summarize_clusters(X, terms, labels, n_clusters, return_scores=False):
+    """
+    Each cluster's top terms by global frequency, as cluster_keywords
+    returns them, and (with return_scores) by c-TF-IDF. Clusters are
+    listed in order of their first document.
+    """
+    import numpy as np
+    from ..pipeline.profiling import span
+
+    with span("cluster_keywords.terms"):
+        # Global term frequency from matrix
+        X_any = cast(Any, X)
+        term_freq = X_any.sum(axis=0).A1
+
+        # Per-cluster term counts
+        in_cluster = cluster_term_counts(X, labels, n_clusters)
+        _, first_doc = np.unique(labels, return_index=True)
+        order = np.unique(labels)[np.argsort(first_doc)]
+
+        # Aggregate keyword frequencies per cluster using global term frequency
+        top = _top_terms(in_cluster, term_freq)
+        clustered = {
+            f"Cluster {label+1}": [(terms[t], int(term_freq[t])) for t in top[label]] for label in order
+        }
+        scores = None
+        if return_scores:
+            distinctive = ctfidf(in_cluster)
+            top = _top_terms(distinctive, distinctive.toarray())
+            scores = {
+                f"Cluster {label+1}": [
+                    (terms[t], int(in_cluster[label, t]), float(distinctive[label, t])) for t in top[label]
+                ]
+                for label in order
+            }
+    return clustered, scores
+
+# Dimensions of the TF-IDF + SVD space used by the "svd" engine
+SVD_COMPONENTS = 200
+
+def _fit_reducer(X, terms, n_components=SVD_COMPONENTS):
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import TfidfTransformer
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import Normalizer
+
+    n_components = max(1, min(n_components, X.shape[1] - 1))
+    model = make_pipeline(
+        TfidfTransformer(sublinear_tf=True),
+        TruncatedSVD(n_components=n_components, random_state=42),
+        Normalizer(copy=False),
+    )
+    model.fit(X)
+    return {"terms": list(terms), "model": model}
+
+def fit_keyword_svd(df=None, column="word_list", token_store=None, fields=None, n_components=SVD_COMPONENTS):
+    """
+    Fits the "svd" engine's reducer (TF-IDF weighting, TruncatedSVD to
+    `n_components` dimensions, L2 normalization) on the document-term
+    matrix cluster_keywords builds from the same inputs. The result is
+    picklable, so it can be cached and passed back as `svd=`.
+    """
+    from ..load.nlp_resources import STOP_WORDS as stop_words
+    from ..pipeline.profiling import span
+
+    X, terms, _ = _keyword_matrix(df, column, token_store, fields, stop_words, with_tokens=False)
+    with span("cluster_keywords.svd", terms=X.shape[1], n_components=n_components):
+        return _fit_reducer(X, terms, n_components)
+
+def cluster_keywords(df=None, column="word_list", n_clusters=6, return_tokens=False, token_store=None, fields=None, engine="counts", svd=None, n_components=SVD_COMPONENTS, return_scores=False, k_values=None, return_selection=False, return_model=False):
+    """
+    Clusters keywords from a dataframe column containing token lists, or
+    straight from a TokenStore.
+
+    Parameters:
+        df (pd.DataFrame): Input dataframe with tokenized keyword lists.
+        column (str): Column name containing token lists.
+        n_clusters (int or "auto"): Number of clusters to generate; "auto"
+            picks it from `k_values` (select_k.K_RANGE by default) by
+            silhouette and Davies-Bouldin scores on samples.
+        return_tokens (bool): Whether to return the filtered token lists.
+        token_store (TokenStore): Tokenized corpus to use instead of `df`;
+            the document-term matrix is built from its integer ids.
+        fields (list): Token store fields to cluster on (default: all).
+        engine (str): "counts" clusters the raw term counts; "svd" clusters
+            TF-IDF vectors projected to `n_components` dense dimensions.
+        svd (dict): Reducer from fit_keyword_svd to reuse with "svd"; it is
+            refitted if its terms do not match this matrix.
+        n_components (int): SVD dimensions when fitting a reducer here.
+        return_scores (bool): Whether to return each cluster's most
+            distinctive terms as well.
+        k_values (iterable): Candidate cluster counts for "auto".
+        return_selection (bool): Whether to return the chosen k and the
+            score curve behind it.
+        return_model (bool): Whether to return the fitted model (see
+            cluster_model), which assigns new documents without a refit.
+
+    Returns:
+        clustered (dict): Cluster ID → list of (keyword, count) tuples.
+        filtered_lists (list): List of filtered token lists (if return_tokens=True).
+        scores (dict): Cluster ID → list of (keyword, in-cluster count,
+            c-TF-IDF) tuples, ranked by c-TF-IDF (if return_scores=True).
+        selection (dict): {"k": chosen k, "curve": one row of scores per
+            candidate, or None when n_clusters was given} (if return_selection=True).
+        model (dict): Terms, reducer, centroids and distance baseline (if return_model=True).
+    """
+    # Heavy imports deferred to function scope so importing this module
+    # doesn't pull large dependencies into the global import path.
+    import numpy as np
+    from sklearn.cluster import KMeans
+    from ..load.nlp_resources import STOP_WORDS as stop_words
+    from ..pipeline.profiling import span
+
+    with span("cluster_keywords.matrix") as counts:
+        X, terms, filtered_lists = _keyword_matrix(df, column, token_store, fields, stop_words, with_tokens=return_tokens)
+        counts["docs"], counts["terms"] = X.shape
+
+    X_fit = X
+    if engine == "svd":
+        if svd is None or list(svd["terms"]) != list(terms):
+            with span("cluster_keywords.svd", terms=X.shape[1], n_components=n_components):
+                svd = _fit_reducer(X, terms, n_components)
+        X_fit = svd["model"].transform(X)
+    elif engine != "counts":
+        raise ValueError(f"Unknown clustering engine: {engine}")
+
+    curve = None
+    if n_clusters == "auto":
+        from .select_k import K_RANGE, select_k
+        n_clusters, curve = select_k(X_fit.astype(np.float64), k_values or K_RANGE, seeds=(42,))
 
     # Cluster documents
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-    labels = kmeans.fit_predict(X)
+    with span("cluster_keywords.kmeans", n_clusters=n_clusters, engine=engine) as counts:
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+        labels = kmeans.fit_predict(X_fit)
+        counts["n_iter"] = int(kmeans.n_iter_)
 
-    # Global term frequency from matrix
-    X_any = cast(Any, X)
-    term_freq = X_any.sum(axis=0).A1
-    term_freq_map = dict(zip(terms, term_freq))
+    clustered, scores = summarize_clusters(X, terms, labels, n_clusters, return_scores)
+    results = (clustered,)
+    if return_tokens:
+        results += (filtered_lists,)
+    if return_scores:
+        results += (scores,)
+    if return_selection:
+        results += ({"k": n_clusters, "curve": curve},)
+    if return_model:
+        from .cluster_model import fitted_model
+        results += (fitted_model(kmeans, X_fit, labels, terms, engine, svd if engine == "svd" else None),)
+    return results if len(results) > 1 else clustered
 
-    # Assign keywords to clusters based on document labels
-    cluster_terms = defaultdict(list)
-    for idx, label in enumerate(labels):
-        for term in filtered_lists[idx]:
-            cluster_terms[label].append(term)
+# Streaming mode: documents per partial_fit call, and hashed vocabulary size
+STREAM_CHUNK_SIZE = 10_000
+HASH_FEATURES = 2 ** 18
 
-    # Aggregate keyword frequencies per cluster using global term frequency
+def _rank_clusters(cluster_terms, term_freq_map):
     clustered = {}
     for label, terms in cluster_terms.items():
-        unique_terms = set(terms)
-        ranked = sorted(unique_terms, key=lambda t: term_freq_map.get(t, 0), reverse=True)
-        clustered[f"Cluster {label+1}"] = [(term, int(term_freq_map.get(term, 0))) for term in ranked[:15]]
+        ranked = sorted(terms, key=lambda t: term_freq_map.get(t, 0), reverse=True)
+        clustered[f"Cluster {label+1}"] = [(term, int(term_freq_map.get(term, 0))) for term in ranked[:TOP_TERMS]]
+    return clustered
 
+def stream_cluster_keywords(n_clusters=6, return_tokens=False, token_store=None, corpus_path=None, fields=None, chunk_size=STREAM_CHUNK_SIZE, n_features=HASH_FEATURES, passes=1, k_values=None):
+    """
+    Clusters keywords like cluster_keywords, but a chunk of documents at a
+    time: MiniBatchKMeans.partial_fit updates the centroids chunk by chunk
+    (`passes` times over the corpus), then a last pass assigns every
+    document and ranks each cluster's terms.
+
+    With a TokenStore the vocabulary is fixed (the store's, so matrix
+    columns are its ids). Otherwise `corpus_path` (the cleaned corpus by
+    default) is read and tokenized chunk by chunk and terms are hashed into
+    `n_features` columns, so no vocabulary is built up front.
+
+    Memory is bounded by one chunk's tokens and matrix, the dense
+    centroids (n_clusters x vocabulary or n_features float64s: 16 MB for
+    8 clusters and the default n_features) and the term counts, which grow
+    with the vocabulary rather than the corpus. Only `filtered_lists`, when
+    requested, grows with the corpus. cluster_keywords instead holds the
+    full matrix and KMeans' per-document state, so expect it to be faster
+    on corpora that fit in memory and this to keep working past them.
+
+    n_clusters="auto" picks k from `k_values` on the first chunk.
+
+    Returns the same `clustered` (and `filtered_lists`) as cluster_keywords.
+    """
+    import numpy as np
+    from sklearn.cluster import MiniBatchKMeans
+    from ..load.nlp_resources import STOP_WORDS as stop_words
+    from ..pipeline.profiling import span
+
+    if token_store is not None:
+        ids, offsets = token_store.select(fields, exclude=stop_words)
+        vocab = np.array(token_store.vocab, dtype=object)
+
+        def chunks():
+            from scipy.sparse import csr_matrix
+            for start in range(0, len(token_store), chunk_size):
+                stop = min(start + chunk_size, len(token_store))
+                chunk_offsets = offsets[start:stop + 1] - offsets[start]
+                chunk_ids = ids[offsets[start]:offsets[stop]]
+                X = csr_matrix(
+                    (np.ones(len(chunk_ids), dtype=np.float64), chunk_ids, chunk_offsets),
+                    shape=(stop - start, len(vocab)),
+                )
+                X.sum_duplicates()
+                words = vocab[chunk_ids].tolist()
+                yield X, [words[chunk_offsets[i]:chunk_offsets[i + 1]] for i in range(stop - start)]
+    else:
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from ..load.corpus_store import CORPUS_PATH, iter_corpus
+        from ..load.token_store import FIELDS, tokenize_frame
+
+        fields = list(fields or FIELDS)
+        vectorizer = HashingVectorizer(
+            analyzer=lambda x: x, n_features=n_features, alternate_sign=False, norm=None
+        )
+
+        def chunks():
+            for df in iter_corpus(corpus_path or CORPUS_PATH, columns=fields, batch_size=chunk_size):
+                word_lists = tokenize_frame(df, fields).token_lists(fields, exclude=stop_words)
+                yield vectorizer.transform(word_lists), word_lists
+
+    if n_clusters == "auto":
+        from .select_k import K_RANGE, select_k
+        X, _ = next(chunks())
+        n_clusters, _ = select_k(X, k_values or K_RANGE, seeds=(42,))
+
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42)
+    term_freq_map = Counter()
+    with span("cluster_keywords.partial_fit", n_clusters=n_clusters) as counts:
+        counts["docs"] = 0
+        for i in range(passes):
+            for X, word_lists in chunks():
+                kmeans.partial_fit(X)
+                if i == 0:
+                    counts["docs"] += X.shape[0]
+                    for words in word_lists:
+                        term_freq_map.update(words)
+
+    # Assign documents and collect each cluster's terms
+    cluster_terms = {}
+    filtered_lists = []
+    with span("cluster_keywords.assign"):
+        for X, word_lists in chunks():
+            for label, words in zip(kmeans.predict(X), word_lists):
+                cluster_terms.setdefault(label, set()).update(words)
+            if return_tokens:
+                filtered_lists.extend(word_lists)
+
+    clustered = _rank_clusters(cluster_terms, term_freq_map)
     if return_tokens:
         return clustered, filtered_lists
-    return clustered
\ No newline at end of file
+    return clustered
+
+def sweep_clusters(df=None, column="word_list", k_values=(4, 6, 8, 10, 12), seeds=(42,), token_store=None, fields=None, workers=None, sample_size=2000):
+    """
+    Fits KMeans for every (k, seed) in the grid on one document-term
+    matrix, built once as in cluster_keywords (seed 42 reproduces its
+    clustering).
+
+    With more than one worker (default: one per core) the fits run in a
+    process pool; the sparse matrix is placed in shared memory and every
+    worker maps it rather than receiving a copy per task.
+
+    Returns one row per fit, ordered by (k, seed): inertia, silhouette on a
+    stratified `sample_size`-document sample, Davies-Bouldin and cluster
+    sizes (largest first).
+    """
+    from ..load.nlp_resources import STOP_WORDS as stop_words
+    from .select_k import evaluate_k
+
+    X, _, _ = _keyword_matrix(df, column, token_store, fields, stop_words, with_tokens=False)
+    X = X.tocsr().astype("float64")
+    # Every fit sees the whole matrix, as cluster_keywords does
+    return evaluate_k(X, k_values, seeds, workers, score_sample=sample_size, fit_sample=None)
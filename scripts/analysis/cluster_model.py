@@ -0,0 +1,183 @@
+import json
+import pickle
+import time
+from pathlib import Path
+
+# Fitted keyword cluster models, one file per version, and the current one
+MODEL_DIR = Path("data_sources/models")
+MODEL_NAME = "keyword_clusters"
+MODEL_FORMAT = 1
+
+# Drift limits past which assigning to the saved model is no longer good enough
+FAR_SHARE_LIMIT = 0.15       # documents farther from their centroid than 95% of the training set
+OOV_SHARE_LIMIT = 0.25       # tokens the model's vocabulary has never seen
+GROWTH_LIMIT = 0.5           # documents added since the fit, relative to the training set
+DISTANCE_RATIO_LIMIT = 1.25  # mean distance to the assigned centroid, relative to training
+
+def fitted_model(kmeans, X_fit, labels, terms, engine="counts", svd=None):
+    """
+    The parts of a cluster_keywords fit needed to place new documents:
+    vocabulary, reducer, centroids and how far training documents sat
+    from their centroids (the baseline drift is measured against).
+    """
+    import numpy as np
+
+    distances = kmeans.transform(X_fit)[np.arange(len(labels)), labels]
+    return {
+        "format": MODEL_FORMAT,
+        "engine": engine,
+        "terms": list(terms),
+        "svd": svd,
+        "centroids": kmeans.cluster_centers_,
+        "n_docs": len(labels),
+        "sizes": np.bincount(labels, minlength=kmeans.n_clusters).tolist(),
+        "distance_mean": float(distances.mean()),
+        "distance_p95": float(np.percentile(distances, 95)),
+    }
+
+def _versions(model_dir=MODEL_DIR):
+    pointer = Path(model_dir) / f"{MODEL_NAME}.json"
+    if not pointer.exists():
+        return {"current": None, "history": []}
+    with pointer.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_model(model, model_dir=MODEL_DIR, **meta):
+    """
+    Writes `model` (with `meta`, e.g. corpus_version, names and colors) as
+    a new version and makes it the current one. Returns the version.
+    """
+    from ..pipeline.cache import fingerprint
+
+    model = {k: v for k, v in {**model, **meta}.items() if k != "term_index"}
+    model["created"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    model["version"] = fingerprint(model["created"], model["engine"], len(model["terms"]), model.get("corpus_version"))[:12]
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    path = model_dir / f"{MODEL_NAME}-{model['version']}.pkl"
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path.replace(path)
+
+    versions = _versions(model_dir)
+    versions["current"] = model["version"]
+    versions["history"].append({"version": model["version"], "created": model["created"], "corpus_version": model.get("corpus_version")})
+    with (model_dir / f"{MODEL_NAME}.json").open("w", encoding="utf-8") as f:
+        json.dump(versions, f, indent=2)
+    print(f"💾 Saved cluster model {model['version']} to {path}")
+    return model["version"]
+
+def current_version(model_dir=MODEL_DIR):
+    return _versions(model_dir)["current"]
+
+def load_model(version=None, model_dir=MODEL_DIR):
+    """The current (or given) model version, or None if there is none."""
+    version = version or _versions(model_dir)["current"]
+    if version is None:
+        return None
+    path = Path(model_dir) / f"{MODEL_NAME}-{version}.pkl"
+    if not path.exists():
+        return None
+    try:
+        with path.open("rb") as f:
+            model = pickle.load(f)
+    except Exception:
+        # Truncated, or pickled against library versions that no longer load
+        return None
+    if not isinstance(model, dict) or model.get("format") != MODEL_FORMAT:
+        return None
+    model["term_index"] = {term: i for i, term in enumerate(model["terms"])}
+    return model
+
+def _model_matrix(model, token_store, fields):
+    """Document-term counts in the model's columns, and the share of unknown tokens."""
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    from ..load.nlp_resources import STOP_WORDS
+
+    index = model.get("term_index") or {term: i for i, term in enumerate(model["terms"])}
+    ids, offsets = token_store.select(fields, exclude=STOP_WORDS)
+    column_of = np.fromiter((index.get(w, -1) for w in token_store.vocab), dtype=np.int64, count=len(token_store.vocab))
+    columns = column_of[ids]
+    known = columns >= 0
+    rows = np.repeat(np.arange(len(token_store)), np.diff(offsets))
+    X = csr_matrix(
+        (np.ones(int(known.sum())), (rows[known], columns[known])),
+        shape=(len(token_store), len(model["terms"])),
+    )
+    oov_share = float(1 - known.mean()) if len(known) else 0.0
+    return X, oov_share
+
+def assign(model, token_store, fields=None):
+    """
+    Places the documents of `token_store` in the model's clusters without
+    refitting. Returns (labels, distances to the assigned centroids, share
+    of tokens outside the model's vocabulary).
+    """
+    import numpy as np
+    from sklearn.metrics.pairwise import euclidean_distances
+
+    X, oov_share = _model_matrix(model, token_store, fields)
+    if model["engine"] == "svd":
+        X = model["svd"]["model"].transform(X)
+    all_distances = euclidean_distances(X, model["centroids"])
+    labels = all_distances.argmin(axis=1)
+    return labels, all_distances[np.arange(len(labels)), labels], oov_share
+
+def assign_documents(model, df):
+    """
+    Assigns new documents (a metadata frame, e.g. a few new papers) to the
+    model's clusters. Returns one (cluster name, distance) per row.
+    """
+    from ..load.token_store import tokenize_frame
+
+    store = tokenize_frame(df)
+    labels, distances, _ = assign(model, store, model.get("fields"))
+    names = model.get("names", {})
+    return [(names.get(f"Cluster {label+1}", f"Cluster {label+1}"), float(d)) for label, d in zip(labels, distances)]
+
+def drift(model, distances, oov_share, n_docs=None):
+    """
+    How far assigned documents are from what the model was fitted on:
+    the share farther from their centroid than the training 95th
+    percentile (0.05 when nothing changed), mean distance relative to
+    training, the unknown-token share and corpus growth. `refit` is set
+    once any of them passes its limit.
+    """
+    import numpy as np
+
+    distances = np.asarray(distances)
+    far_share = float((distances > model["distance_p95"]).mean()) if len(distances) else 0.0
+    distance_ratio = float(distances.mean()) / model["distance_mean"] if len(distances) and model["distance_mean"] else None
+    growth = (n_docs - model["n_docs"]) / model["n_docs"] if n_docs is not None else 0.0
+    report = {
+        "far_share": round(far_share, 4),
+        "distance_ratio": round(distance_ratio, 4) if distance_ratio is not None else None,
+        "oov_share": round(oov_share, 4),
+        "growth": round(growth, 4),
+    }
+    report["refit"] = (
+        far_share > FAR_SHARE_LIMIT
+        or (distance_ratio is not None and distance_ratio > DISTANCE_RATIO_LIMIT)
+        or oov_share > OOV_SHARE_LIMIT
+        or growth > GROWTH_LIMIT
+    )
+    return report
+
+def assign_corpus(model, token_store, fields):
+    """
+    Assigns every document of the corpus to the saved model. Returns
+    (clustered, drift report), with clusters summarized as cluster_keywords
+    does, so IDs and names carry over from the model.
+    """
+    from .cluster_keywords import _keyword_matrix, summarize_clusters
+    from ..load.nlp_resources import STOP_WORDS
+    from ..pipeline.profiling import span
+
+    with span("cluster_model.assign", docs=len(token_store)):
+        labels, distances, oov_share = assign(model, token_store, fields)
+    report = drift(model, distances, oov_share, n_docs=len(token_store))
+    X, terms, _ = _keyword_matrix(None, None, token_store, fields, STOP_WORDS, with_tokens=False)
+    clustered, _ = summarize_clusters(X, terms, labels, len(model["centroids"]))
+    return clustered, report
@@ -1,14 +1,13 @@
 import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
 from collections import defaultdict, Counter
 
 # Lazy model loader for sentence-transformers to avoid importing heavy
 # dependencies at module import time unless the author embeddings are used.
 _sbert_model = None
+MODEL_NAME = "all-MiniLM-L6-v2"
 
 
-def build_author_embeddings(parsed_entries):
+def build_author_embeddings(parsed_entries, model_name=MODEL_NAME):
     author_texts = defaultdict(list)
     for entry in parsed_entries:
         authors = entry.get("authors", [])
@@ -23,7 +22,7 @@ def build_author_embeddings(parsed_entries):
             from sentence_transformers import SentenceTransformer
         except Exception:
             raise
-        _sbert_model = SentenceTransformer("all-MiniLM-L6-v2")
+        _sbert_model = SentenceTransformer(model_name)
 
     embeddings = {}
     for author, texts in author_texts.items():
@@ -33,11 +32,25 @@ def build_author_embeddings(parsed_entries):
 
  
 
-def cluster_author_embeddings(embeddings, n_clusters=2):
+def cluster_author_embeddings(embeddings, n_clusters=2, k_values=None, return_selection=False):
+    """
+    KMeans over the author embeddings. n_clusters="auto" picks k from
+    `k_values` (select_k.K_RANGE by default) by silhouette and
+    Davies-Bouldin scores; with return_selection the chosen k and score
+    curve are returned as well.
+    """
+    from sklearn.cluster import KMeans
     X = np.array(list(embeddings.values()))
+    curve = None
+    if n_clusters == "auto":
+        from scripts.analysis.select_k import K_RANGE, select_k
+        n_clusters, curve = select_k(X, k_values or K_RANGE, seeds=(1472,))
     kmeans = KMeans(n_clusters=n_clusters, random_state=1472)
     labels = kmeans.fit_predict(X)
-    return dict(zip(embeddings.keys(), labels))
+    labels = dict(zip(embeddings.keys(), labels))
+    if return_selection:
+        return labels, {"k": n_clusters, "curve": curve}
+    return labels
 
  
 
@@ -63,5 +76,6 @@ def label_clusters_by_keywords(parsed_entries, cluster_map, top_k=5):
 def project_embeddings_pca(embeddings, n_components=2):
     authors = list(embeddings.keys())
     X = np.array([embeddings[a] for a in authors])
+    from sklearn.decomposition import PCA
     coords = PCA(n_components=n_components).fit_transform(X)
     return dict(zip(authors, coords))
\ No newline at end of file
@@ -1,19 +1,32 @@
 from scripts.analysis.co_author.ris_clean import load_ris_clean
+from scripts.clean.deduplicate import deduplicate_records
 from scripts.analysis.co_author.build_author_matrix import build_author_matrix
 from scripts.analysis.co_author import build_author_topics as bat
 from scripts.analysis.co_author.cluster_author_graph import cluster_author_graph
 from scripts.analysis.co_author.visualize_author_map import visualize_author_graph
 
-def run_pipeline(ris_path="data_sources/raw/mendeley_export.ris"):
-    print("Launching author pipeline...")
+# Semantic clusters of author embeddings, or "auto" to choose the count
+N_CLUSTERS = 6
+
+def load_author_entries(ris_path="data_sources/raw/mendeley_export.ris"):
+    """Parses the RIS export and drops repeated entries; None if nothing parsed."""
     parsed = load_ris_clean(ris_path)
     if not parsed:
         print("No entries parsed. Aborting.")
-        return
+        return None
 
-    matrix = build_author_matrix(parsed)
-    embeddings = bat.build_author_embeddings(parsed)
-    semantic_labels = bat.cluster_author_embeddings(embeddings, n_clusters=6)
+    # Repeated exports of the same paper would double-count co-authorships
+    deduped = deduplicate_records(parsed)
+    if len(deduped) < len(parsed):
+        print(f"Dropped {len(parsed) - len(deduped)} duplicate RIS entries")
+    return deduped
+
+def assemble_author_graph(parsed, matrix, embeddings):
+    """
+    Builds the co-authorship graph from the co-author matrix, with semantic
+    cluster labels from the embeddings and PCA layout seeds.
+    """
+    semantic_labels = bat.cluster_author_embeddings(embeddings, n_clusters=N_CLUSTERS)
     cluster_labels = bat.label_clusters_by_keywords(parsed, semantic_labels, top_k=2)
     semantic_labels_named = {
         author: cluster_labels[cluster_id]
@@ -28,7 +41,25 @@ def run_pipeline(ris_path="data_sources/raw/mendeley_export.ris"):
     for author, (x, y) in scaled_coords.items():
         if author in G.nodes:
             G.nodes[author]['layout_seed'] = (x, y)
+    return G
 
+def build_author_graph(ris_path="data_sources/raw/mendeley_export.ris"):
+    """
+    Parses the RIS export and builds the co-authorship graph with semantic
+    cluster labels and PCA layout seeds. Returns None if nothing parsed.
+    """
+    parsed = load_author_entries(ris_path)
+    if parsed is None:
+        return None
+    matrix = build_author_matrix(parsed)
+    embeddings = bat.build_author_embeddings(parsed)
+    return assemble_author_graph(parsed, matrix, embeddings)
+
+def run_pipeline(ris_path="data_sources/raw/mendeley_export.ris"):
+    print("Launching author pipeline...")
+    G = build_author_graph(ris_path)
+    if G is None:
+        return
     visualize_author_graph(G)
     print("G type:", type(G))
 
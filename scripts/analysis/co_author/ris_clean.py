@@ -1,8 +1,9 @@
-import rispy
+from scripts.extraction.ris_reader import iter_entries
 
-def load_ris_clean(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        entries = rispy.load(f)
-    for entry in entries:
+def iter_ris_clean(filepath, tags=None, use_mmap=False):
+    for entry in iter_entries(filepath, tags=tags, use_mmap=use_mmap):
         entry['authors'] = entry.get('authors', [])
-    return entries
\ No newline at end of file
+        yield entry
+
+def load_ris_clean(filepath, tags=None, use_mmap=False):
+    return list(iter_ris_clean(filepath, tags=tags, use_mmap=use_mmap))
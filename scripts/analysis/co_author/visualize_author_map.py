@@ -6,6 +6,7 @@ from random import uniform
 from scipy.spatial import ConvexHull
 from scipy.interpolate import splprep, splev
 import matplotlib.patheffects as pe
+from scripts.visualize.render import show_figure
 
 def apply_jitter(pos, scale=0.01):
     return {
@@ -34,7 +35,7 @@ def draw_cluster_hull_smooth(ax, pos, nodes, color="#1f77b4", alpha=0.1, padding
 
     ax.fill(xi, yi, color=color, alpha=alpha, zorder=0)
 
-def visualize_author_graph(G, seed=1472, k=0.5, iterations=10, cluster_expand=0.5):
+def visualize_author_graph(G, seed=1472, k=0.5, iterations=10, cluster_expand=0.5, output_name="author_map"):
     # Prepare a layout-specific edge weight that reduces attraction for very
     # heavily-weighted edges. By inverting the original weight we make strong
     # co-authorship links pull less during spring layout, which helps reduce
@@ -151,4 +152,4 @@ def visualize_author_graph(G, seed=1472, k=0.5, iterations=10, cluster_expand=0.
     ax.axis('on') # Turn on/off axis
     ax.set_title("Co-Authorship Network (With Topic Modelled Semantic Groups)", fontsize=14)
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    return show_figure(fig, name=output_name)
\ No newline at end of file
@@ -1,45 +1,18 @@
 import json
-import pandas as pd
 from pathlib import Path
+from .prisma_ledger import LEDGER_PATH, prisma_counts
 
 def count_prisma_stages():
-    input_path = Path("data_sources/raw/cleaned_metadata.json")
-    exclusion_path = Path("data_sources_raw/logs/prisma_exclusions.json")
     output_path = Path("data_sources_raw/logs/prisma_counts.json")
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    if not input_path.exists():
-        raise FileNotFoundError(f"Missing input file: {input_path}")
+    if not LEDGER_PATH.exists():
+        raise FileNotFoundError(f"Missing PRISMA ledger: {LEDGER_PATH}. Run clean_data first.")
 
-    df = pd.read_json(input_path)
-
-    # Count entries tagged as mendeley_api
-    identified = len(df[df["ingestion_source"] == "mendeley_api"])
-    screened = identified
-
-    # Load exclusion reasons and total
-    excluded_total = 0
-    if exclusion_path.exists():
-        with exclusion_path.open("r", encoding="utf-8") as f:
-            exclusion_data = json.load(f)
-            if isinstance(exclusion_data, dict):
-                excluded_total = sum(exclusion_data.values())
-            elif isinstance(exclusion_data, int):
-                excluded_total = exclusion_data
-
-    assessed = screened - excluded_total
-    included = assessed
-
-    counts = {
-        "records_identified": identified,
-        "duplicates_removed": 0,
-        "records_screened": screened,
-        "records_excluded": excluded_total,
-        "reports_assessed": assessed,
-        "reports_excluded": 0,
-        "studies_included": included
-    }
+    # Stage counts come from the ledger's materialized aggregates, not the corpus
+    counts = prisma_counts()
 
+    # Snapshot for tools that read the counts file
     with output_path.open("w", encoding="utf-8") as f:
         json.dump(counts, f, indent=2)
 
@@ -47,6 +20,7 @@ def count_prisma_stages():
     for k, v in counts.items():
         print(f"  {k}: {v}")
     print(f"\nCounts saved to: {output_path.resolve()}")
+    return counts
 
 if __name__ == "__main__":
-    count_prisma_stages()
\ No newline at end of file
+    count_prisma_stages()
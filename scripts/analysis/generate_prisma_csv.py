@@ -1,16 +1,21 @@
 import csv
-import json
+from contextlib import closing
 from pathlib import Path
+from .prisma_ledger import LEDGER_PATH, connect, prisma_counts, reason_breakdown
 
-def generate_csv():
-    counts_path = Path("data_sources_raw/logs/prisma_counts.json")
+def generate_csv(counts=None):
+    """Writes the PRISMA 2020 flow CSV; `counts` defaults to the ledger's current counts."""
     output_path = Path("data_sources_raw/logs/prisma_flow.csv")
 
-    if not counts_path.exists():
-        raise FileNotFoundError("Missing prisma_counts.json. Run count_prisma_stages.py first.")
+    if not LEDGER_PATH.exists():
+        raise FileNotFoundError(f"Missing PRISMA ledger: {LEDGER_PATH}. Run clean_data first.")
 
-    with counts_path.open("r", encoding="utf-8") as f:
-        counts = json.load(f)
+    counts = dict(counts) if counts is not None else prisma_counts()
+    # PRISMA2020 takes "Reason1, n; Reason2, n" in the n column of dbr_excluded
+    with closing(connect()) as ledger:
+        dbr_reasons = reason_breakdown("eligibility", ledger)
+    if dbr_reasons:
+        counts["dbr_excluded_reasons"] = "; ".join(f"{reason}, {n}" for reason, n in dbr_reasons.items())
 
     def row(data, node, box, description, boxtext, tooltips, url, key=None):
         return {
@@ -59,7 +64,7 @@ def generate_csv():
         row("other_sought_reports", "node18", "box12", "Reports sought for retrieval (other)", "Reports sought for retrieval", "Reports sought for retrieval (other)", "other_sought_reports.html"),
         row("other_notretrieved_reports", "node19", "box13", "Reports not retrieved (other)", "Reports not retrieved", "Reports not retrieved (other)", "other_notretrieved_reports.html"),
         row("dbr_assessed", "node13", "box8", "Reports assessed for eligibility (databases and registers)", "Reports assessed for eligibility", "Reports assessed for eligibility (databases and registers)", "dbr_assessed.html", "reports_assessed"),
-        row("dbr_excluded", "node14", "box9", "Reports excluded (databases and registers): [separate reasons and numbers using ; e.g. Reason1, xxx; Reason2, xxx; Reason3, xxx]", "Reports excluded", "Reports excluded (databases and registers)", "dbrexcludedrecords.html", "reports_excluded"),
+        row("dbr_excluded", "node14", "box9", "Reports excluded (databases and registers): [separate reasons and numbers using ; e.g. Reason1, xxx; Reason2, xxx; Reason3, xxx]", "Reports excluded", "Reports excluded (databases and registers)", "dbrexcludedrecords.html", "dbr_excluded_reasons" if dbr_reasons else "reports_excluded"),
         row("other_assessed", "node20", "box14", "Reports assessed for eligibility (other)", "Reports assessed for eligibility", "Reports assessed for eligibility (other)", "other_assessed.html"),
         row("other_excluded", "node21", "box15", "Reports excluded (other): [separate reasons and numbers using ; e.g. Reason1, xxx; Reason2, xxx; Reason3, xxx]", "Reports excluded", "Reports excluded (other)", "other_excluded.html"),
 
@@ -80,6 +85,7 @@ def generate_csv():
         writer.writerows(rows)
 
     print(f"✅ PRISMA2020-compliant CSV saved to: {output_path.resolve()}")
+    return output_path
 
 if __name__ == "__main__":
     generate_csv()
\ No newline at end of file
@@ -1,17 +1,123 @@
+import atexit
 import json
+import os
+import threading
 from datetime import datetime
 from pathlib import Path
+from . import prisma_ledger
 
 LOG_PATH = Path("data_sources_raw/logs/prisma_decisions.jsonl")
+BATCH_SIZE = 1000  # Buffered entries before a write
+
+class DecisionLogWriter:
+    """
+    Buffered writer for the PRISMA decision log.
+
+    Entries are kept in memory and appended to the JSONL log in batches of
+    `batch_size`, with the file opened once for the writer's lifetime. Each
+    batch is also upserted into the SQLite PRISMA ledger in one transaction
+    (skip with `ledger=False`). `sync()` writes the buffer and forces both to
+    disk; call it at the end of a stage so a crash can lose at most the
+    stage in progress. Leaving the `with` block syncs and closes both, also
+    when the stage failed, so decisions made before the error are kept.
+
+        with DecisionLogWriter() as log:
+            log.log_many(entries, stage="screening", decision="exclude_irrelevant")
+            log.sync()
+    """
+
+    def __init__(self, path=None, batch_size=BATCH_SIZE, ledger=True, ledger_path=None):
+        self.path = Path(path) if path is not None else LOG_PATH
+        self.batch_size = batch_size
+        self._buffer = []
+        self._file = None
+        self._ledger = prisma_ledger.connect(ledger_path) if ledger else None
+
+    def log(self, record_id, stage, decision, reason, timestamp=None):
+        self._buffer.append((record_id, stage, decision, reason, timestamp or datetime.utcnow().isoformat()))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def log_many(self, entries, stage, decision):
+        """Logs (record_id, reason) pairs that share one stage, decision and timestamp."""
+        timestamp = datetime.utcnow().isoformat()
+        for record_id, reason in entries:
+            self.log(record_id, stage, decision, reason, timestamp)
+
+    def flush(self):
+        """Writes buffered entries to the OS (not necessarily to disk)."""
+        if not self._buffer:
+            return
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a", encoding="utf-8")
+        self._file.write("\n".join(
+            json.dumps({"id": record_id, "stage": stage, "decision": decision, "reason": reason, "timestamp": timestamp})
+            for record_id, stage, decision, reason, timestamp in self._buffer
+        ) + "\n")
+        self._file.flush()
+        if self._ledger is not None:
+            prisma_ledger.record_decisions(self._buffer, self._ledger)
+        self._buffer.clear()
+
+    def sync(self):
+        """Flushes and fsyncs, making every logged decision durable."""
+        self.flush()
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+        if self._ledger is not None:
+            self._ledger.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def close(self):
+        try:
+            self.sync()
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._ledger is not None:
+                self._ledger.close()
+                self._ledger = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+# Decisions logged one at a time, written out in batches
+_pending = []
+_pending_lock = threading.Lock()
+
+def flush_decisions():
+    """Writes the decisions buffered by log_decision (also run at exit)."""
+    with _pending_lock:
+        if not _pending:
+            return
+        with DecisionLogWriter() as log:
+            for entry in _pending:
+                log.log(*entry)
+        _pending.clear()
 
 def log_decision(record_id, stage, decision, reason):
-    entry = {
-        "id": record_id,
-        "stage": stage,
-        "decision": decision,
-        "reason": reason,
-        "timestamp": datetime.utcnow().isoformat()
-    }
-    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with LOG_PATH.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(entry) + "\n")
\ No newline at end of file
+    """
+    Logs a single decision; kept for callers that log one record at a time.
+    Decisions are buffered and written every BATCH_SIZE calls, before the
+    next log_decisions batch, on flush_decisions() and at exit.
+    """
+    with _pending_lock:
+        _pending.append((record_id, stage, decision, reason, datetime.utcnow().isoformat()))
+        full = len(_pending) >= BATCH_SIZE
+    if full:
+        flush_decisions()
+
+def log_decisions(entries, stage, decision):
+    """Appends a batch of (record_id, reason) decisions with a single file open."""
+    if not entries:
+        return
+    flush_decisions()
+    with DecisionLogWriter() as log:
+        log.log_many(entries, stage, decision)
+
+atexit.register(flush_decisions)
@@ -83,10 +83,12 @@ def name_clusters(clusters):
             fallback_terms = [kw for kw in top_terms if kw.isalpha()]
             label = f"Emergent Theme: {' / '.join(fallback_terms[:1])}"
 
-            # Ensure uniqueness
-            while label in used_labels:
-                fallback_terms = fallback_terms[1:] + [kw for kw in terms[len(fallback_terms):len(fallback_terms)+1]]
-                label = f"Emergent Theme: {' / '.join(fallback_terms[:1])}"
+            # Ensure uniqueness: try the cluster's other terms in rank order,
+            # then fall back to the cluster id (clusters can share every term)
+            candidates = [f"Emergent Theme: {kw}" for kw in fallback_terms[1:] + terms[len(top_terms):]]
+            candidates.append(f"Emergent Theme: {cluster_id}")
+            while label in used_labels and candidates:
+                label = candidates.pop(0)
 
             print(f"⚠️ Fallback label used for Cluster {cluster_id}: {label}")
 
@@ -0,0 +1,162 @@
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+LEDGER_PATH = Path("data_sources_raw/logs/prisma_ledger.sqlite")
+BUSY_TIMEOUT_MS = 30_000
+
+# One row per record and stage; a record re-screened in the same stage
+# replaces its earlier decision. reason_counts is the materialized
+# per-stage/per-reason aggregate, kept current by triggers inside the same
+# transaction as the decision rows, and stage_totals holds stage-level
+# numbers that are not per-record decisions (e.g. records identified).
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    record_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    decision TEXT NOT NULL,
+    reason TEXT,
+    timestamp TEXT,
+    PRIMARY KEY (stage, record_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS decisions_by_reason ON decisions (stage, decision, reason);
+
+CREATE TABLE IF NOT EXISTS reason_counts (
+    stage TEXT NOT NULL,
+    decision TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (stage, decision, reason)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stage_totals (
+    stage TEXT NOT NULL,
+    name TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (stage, name)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS decisions_insert AFTER INSERT ON decisions BEGIN
+    INSERT INTO reason_counts (stage, decision, reason, n)
+    VALUES (NEW.stage, NEW.decision, COALESCE(NEW.reason, ''), 1)
+    ON CONFLICT (stage, decision, reason) DO UPDATE SET n = n + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS decisions_delete AFTER DELETE ON decisions BEGIN
+    UPDATE reason_counts SET n = n - 1
+    WHERE stage = OLD.stage AND decision = OLD.decision AND reason = COALESCE(OLD.reason, '');
+    DELETE FROM reason_counts WHERE n <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS decisions_update AFTER UPDATE ON decisions BEGIN
+    UPDATE reason_counts SET n = n - 1
+    WHERE stage = OLD.stage AND decision = OLD.decision AND reason = COALESCE(OLD.reason, '');
+    DELETE FROM reason_counts WHERE n <= 0;
+    INSERT INTO reason_counts (stage, decision, reason, n)
+    VALUES (NEW.stage, NEW.decision, COALESCE(NEW.reason, ''), 1)
+    ON CONFLICT (stage, decision, reason) DO UPDATE SET n = n + 1;
+END;
+"""
+
+def connect(path=None):
+    """
+    Opens the ledger, creating it if needed.
+
+    WAL mode lets readers run while a stage writes, and the busy timeout
+    makes concurrent writers (e.g. parallel stages) wait for each other
+    instead of failing.
+    """
+    path = Path(path) if path is not None else LEDGER_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000)
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def reset_ledger(path=None):
+    """Deletes the ledger (and its WAL files) so the next run starts empty."""
+    path = Path(path) if path is not None else LEDGER_PATH
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+def clear_stages(stages, conn):
+    """Drops every decision and total recorded for `stages`."""
+    with conn:
+        for stage in stages:
+            conn.execute("DELETE FROM decisions WHERE stage = ?", (stage,))
+            conn.execute("DELETE FROM stage_totals WHERE stage = ?", (stage,))
+
+def record_decisions(rows, conn):
+    """
+    Upserts (record_id, stage, decision, reason, timestamp) rows in one
+    transaction; the aggregates are updated by the triggers.
+    """
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO decisions (record_id, stage, decision, reason, timestamp)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (stage, record_id) DO UPDATE SET
+                decision = excluded.decision, reason = excluded.reason, timestamp = excluded.timestamp
+            """,
+            rows,
+        )
+
+def set_stage_total(stage, name, n, conn):
+    with conn:
+        conn.execute(
+            "INSERT INTO stage_totals (stage, name, n) VALUES (?, ?, ?) "
+            "ON CONFLICT (stage, name) DO UPDATE SET n = excluded.n",
+            (stage, name, int(n)),
+        )
+
+def stage_total(stage, name, conn, default=None):
+    row = conn.execute("SELECT n FROM stage_totals WHERE stage = ? AND name = ?", (stage, name)).fetchone()
+    return row[0] if row else default
+
+def decision_count(stage, conn, decision=None):
+    """Number of records with a decision in `stage` (optionally one decision type)."""
+    if decision is None:
+        row = conn.execute("SELECT COALESCE(SUM(n), 0) FROM reason_counts WHERE stage = ?", (stage,)).fetchone()
+    else:
+        row = conn.execute(
+            "SELECT COALESCE(SUM(n), 0) FROM reason_counts WHERE stage = ? AND decision = ?", (stage, decision)
+        ).fetchone()
+    return row[0]
+
+def reason_breakdown(stage, conn, decision=None):
+    """Returns {reason: count} for `stage`, largest first."""
+    query = "SELECT reason, SUM(n) FROM reason_counts WHERE stage = ?"
+    params = [stage]
+    if decision is not None:
+        query += " AND decision = ?"
+        params.append(decision)
+    query += " GROUP BY reason ORDER BY SUM(n) DESC, reason"
+    return {reason: n for reason, n in conn.execute(query, params)}
+
+def prisma_counts(path=None):
+    """
+    PRISMA 2020 flow counts read from the ledger's aggregates.
+
+    Identification comes from the records_identified total and duplicate
+    decisions, screening from the screening exclusions, and reports
+    excluded from any decisions logged in the eligibility stage.
+    """
+    with closing(connect(path)) as conn:
+        duplicates_removed = decision_count("identification", conn, decision="exclude_duplicate")
+        identified = stage_total("identification", "records_identified", conn, default=0)
+        screened = identified - duplicates_removed
+        excluded = decision_count("screening", conn)
+        assessed = screened - excluded
+        reports_excluded = decision_count("eligibility", conn)
+        return {
+            "records_identified": identified,
+            "duplicates_removed": duplicates_removed,
+            "records_screened": screened,
+            "records_excluded": excluded,
+            "reports_assessed": assessed,
+            "reports_excluded": reports_excluded,
+            "studies_included": assessed - reports_excluded,
+        }
@@ -1,6 +1,4 @@
-import subprocess
-
 def refresh_prisma():
-    subprocess.run(["python", "-m", "scripts.clean.clean_data"], check=True)
-    subprocess.run(["python", "-m", "scripts.analysis.count_prisma_stages"], check=True)
-    subprocess.run(["python", "-m", "scripts.analysis.generate_prisma_csv"], check=True)
\ No newline at end of file
+    # Clean, count and write the CSV in this process, skipping the map stages
+    from ..pipeline.stages import run
+    return run(targets=["prisma_csv"])["prisma_csv"]
@@ -0,0 +1,202 @@
+import os
+
+# Candidate cluster counts tried by n_clusters="auto"
+K_RANGE = range(2, 13)
+# Rows each candidate is fitted on, and rows its silhouette is scored on
+FIT_SAMPLE = 20_000
+SCORE_SAMPLE = 2_000
+
+# Pool workers attach to the shared matrix once, at start-up
+_shared = None
+
+def _share(X):
+    """Copies a CSR or dense matrix into shared memory; returns (blocks, spec)."""
+    import numpy as np
+    from multiprocessing import shared_memory
+    from scipy.sparse import issparse
+
+    names = ("data", "indices", "indptr") if issparse(X) else ("dense",)
+    blocks, spec = [], {"shape": X.shape, "sparse": issparse(X)}
+    for name in names:
+        array = getattr(X, name) if issparse(X) else np.ascontiguousarray(X)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+        blocks.append(block)
+        spec[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, spec
+
+def _attach(spec):
+    """
+    Pool initializer: maps the shared arrays without copying them, and caps
+    BLAS/OpenMP at one thread so workers do not oversubscribe the cores.
+    """
+    global _shared
+    import numpy as np
+    from multiprocessing import shared_memory
+    from scipy.sparse import csr_matrix
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(1)
+
+    # Workers share the parent's resource tracker, which unlinks the blocks
+    blocks, arrays = [], []
+    for name in ("data", "indices", "indptr") if spec["sparse"] else ("dense",):
+        block_name, shape, dtype = spec[name]
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+    X = csr_matrix(tuple(arrays), shape=spec["shape"], copy=False) if spec["sparse"] else arrays[0]
+    _shared = (X, blocks)
+
+def stratified_sample(labels, size, seed=42):
+    """
+    Row positions of a `size`-row sample with every cluster represented in
+    proportion to its size (at least one row each).
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    share = min(1.0, size / len(labels))
+    picked = []
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        take = min(len(members), max(1, round(len(members) * share)))
+        picked.append(rng.choice(members, take, replace=False))
+    return np.sort(np.concatenate(picked))
+
+def davies_bouldin(X, labels):
+    """
+    Davies-Bouldin index (lower is better) for a dense or sparse `X`,
+    in one pass over the rows.
+    """
+    import numpy as np
+    from scipy.sparse import csr_matrix, issparse
+
+    clusters, labels = np.unique(labels, return_inverse=True)
+    if len(clusters) < 2:
+        return None
+    n = len(labels)
+    indicator = csr_matrix((np.ones(n), (labels, np.arange(n))), shape=(len(clusters), n))
+    sizes = np.bincount(labels)
+    centroids = indicator @ X
+    centroids = (centroids.toarray() if issparse(centroids) else np.asarray(centroids)) / sizes[:, None]
+
+    # |x - c|^2 = |x|^2 - 2 x.c + |c|^2, so sparse rows are never densified
+    row_norms = np.asarray(X.multiply(X).sum(axis=1)).ravel() if issparse(X) else (X ** 2).sum(axis=1)
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    dots = np.asarray(X @ centroids.T)[np.arange(n), labels]
+    distances = np.sqrt(np.maximum(row_norms - 2 * dots + centroid_norms[labels], 0))
+    scatter = np.bincount(labels, weights=distances) / sizes
+
+    separation = np.sqrt(np.maximum(centroid_norms[:, None] - 2 * centroids @ centroids.T + centroid_norms[None, :], 0))
+    # As sklearn: coincident centroids are ignored, and a cluster is never compared with itself
+    if np.allclose(scatter, 0) or np.allclose(separation, 0):
+        return 0.0
+    separation[separation == 0] = np.inf
+    np.fill_diagonal(separation, np.inf)
+    ratios = (scatter[:, None] + scatter[None, :]) / separation
+    return float(ratios.max(axis=1).mean())
+
+def _score(k, seed, score_sample, X=None):
+    import numpy as np
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+
+    X = _shared[0] if X is None else X
+    kmeans = KMeans(n_clusters=k, random_state=seed)
+    labels = kmeans.fit_predict(X)
+    silhouette = None
+    if 1 < len(np.unique(labels)) < X.shape[0]:
+        rows = stratified_sample(labels, score_sample, seed)
+        if 1 < len(np.unique(labels[rows])) < len(rows):
+            silhouette = float(silhouette_score(X[rows], labels[rows]))
+    return {
+        "k": k,
+        "seed": seed,
+        "inertia": float(kmeans.inertia_),
+        "silhouette": silhouette,
+        "davies_bouldin": davies_bouldin(X, labels),
+        "sizes": sorted(np.bincount(labels, minlength=k).tolist(), reverse=True),
+    }
+
+def evaluate_k(X, k_values=K_RANGE, seeds=(42,), workers=None, score_sample=SCORE_SAMPLE, fit_sample=FIT_SAMPLE):
+    """
+    Fits KMeans for every (k, seed) and scores it: inertia, silhouette on a
+    stratified `score_sample`-row sample and Davies-Bouldin on every fitted
+    row. With `fit_sample`, candidates are fitted on that many randomly
+    chosen rows, so the cost does not grow with the corpus.
+
+    With more than one worker (default: one per core) the fits run in a
+    process pool of single-threaded workers; `X` is placed in shared memory
+    and every worker maps it rather than receiving a copy per task. Returns one row per fit, ordered by (k, seed).
+    """
+    import numpy as np
+
+    if fit_sample and X.shape[0] > fit_sample:
+        rows = np.sort(np.random.default_rng(seeds[0]).choice(X.shape[0], fit_sample, replace=False))
+        X = X[rows]
+    grid = [(k, seed) for k in k_values for seed in seeds if k <= X.shape[0]]
+    workers = min(workers or os.cpu_count() or 1, len(grid)) or 1
+
+    if workers == 1:
+        return [_score(k, seed, score_sample, X) for k, seed in grid]
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    blocks, spec = _share(X)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_attach,
+            initargs=(spec,),
+        ) as pool:
+            futures = [pool.submit(_score, k, seed, score_sample) for k, seed in grid]
+            return [future.result() for future in futures]
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+def choose_k(curve):
+    """
+    The k with the best mean silhouette over seeds, Davies-Bouldin breaking
+    ties (and deciding alone when no silhouette could be computed).
+    """
+    by_k = {}
+    for row in curve:
+        by_k.setdefault(row["k"], []).append(row)
+
+    def mean(rows, key):
+        values = [r[key] for r in rows if r[key] is not None]
+        return sum(values) / len(values) if values else None
+
+    def rank(k):
+        silhouette, db = mean(by_k[k], "silhouette"), mean(by_k[k], "davies_bouldin")
+        return (silhouette if silhouette is not None else float("-inf"), -db if db is not None else float("-inf"))
+
+    return max(by_k, key=rank)
+
+def select_k(X, k_values=K_RANGE, seeds=(42,), workers=None, score_sample=SCORE_SAMPLE, fit_sample=FIT_SAMPLE):
+    """Evaluates `k_values` on `X` and returns (chosen k, score curve)."""
+    from ..pipeline.profiling import span
+
+    k_values = [k for k in k_values if 1 < k < X.shape[0]]
+    if not k_values:
+        raise ValueError(f"No candidate k fits {X.shape[0]} rows")
+    with span("select_k", candidates=len(k_values), rows=X.shape[0]):
+        curve = evaluate_k(X, k_values, seeds, workers, score_sample, fit_sample)
+    k = choose_k(curve)
+    print_curve(curve)
+    print(f"🔢 Chose k = {k}")
+    return k, curve
+
+def print_curve(rows):
+    """Prints score rows as a comparison table, one line per (k, seed)."""
+    print(f"{'k':>4} {'seed':>6} {'inertia':>14} {'silhouette':>11} {'davies-b.':>10}  sizes (largest first)")
+    for row in rows:
+        silhouette = "-" if row["silhouette"] is None else f"{row['silhouette']:.4f}"
+        db = "-" if row["davies_bouldin"] is None else f"{row['davies_bouldin']:.3f}"
+        sizes = ", ".join(map(str, row["sizes"][:12])) + (", ..." if len(row["sizes"]) > 12 else "")
+        print(f"{row['k']:>4} {row['seed']:>6} {row['inertia']:>14.1f} {silhouette:>11} {db:>10}  {sizes}")
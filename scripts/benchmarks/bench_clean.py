@@ -0,0 +1,174 @@
+"""
+Benchmarks clean_dataframe and checks it against the previous row-wise screen.
+
+    python -m scripts.benchmarks.bench_clean --rows 10000 100000 1000000
+    python -m scripts.benchmarks.bench_clean --rows 100000 --workers 1 2 4 8
+
+Rows are drawn from the sample Mendeley metadata (with titles, abstracts and
+years perturbed so every screening rule fires). The row-wise reference is
+only run up to --reference-max rows because it is the slow path. With
+--workers, each row count is instead screened through clean_chunks at every
+worker count and the decision log and exclusion counts are compared with the
+serial run.
+"""
+import argparse
+import json
+import re
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scripts.analysis import log_prisma_decision, prisma_ledger
+from scripts.clean import clean_data
+from scripts.clean.check_criteria import check_criteria
+
+SAMPLE_PATH = "data_sources/raw/mendeley_metadata.json"
+
+def clean_dataframe_rowwise(df):
+    """The iterrows implementation clean_dataframe replaced, kept as a reference."""
+    valid_rows = []
+    exclusion_reasons = {}
+    excluded = []
+
+    def is_valid_record(row):
+        abstract = row.get("abstract", "")
+        title = row.get("title", "")
+        year = row.get("year", "")
+        if isinstance(abstract, list):
+            abstract = " ".join(map(str, abstract))
+        if not isinstance(abstract, str):
+            abstract = str(abstract)
+        abstract = abstract.strip()
+        if not isinstance(title, str):
+            title = str(title)
+        title = title.strip()
+        year_match = pd.Series(str(year)).str.extract(r"(\d{4})")[0]
+        valid_year = year_match.iloc[0] if not year_match.isna().iloc[0] else None
+        if abstract == "" or len(abstract) < 30:
+            return False, "Missing or short abstract"
+        if title == "":
+            return False, "Missing title"
+        if valid_year is None:
+            return False, "Invalid or missing year"
+        tokens = re.findall(r"\b[a-zA-Z]{3,}\b", f"{title} {abstract}".lower())
+        filtered_tokens = [t for t in tokens if t not in clean_data.STOP_WORDS]
+        if len(filtered_tokens) < clean_data.MIN_TOPICAL_TOKENS:
+            return False, f"Not enough topical tokens ({len(filtered_tokens)})"
+        record = {
+            "title": title,
+            "abstract": abstract,
+            "keywords": row.get("keywords", []),
+            "publication_type": row.get("publication_type", ""),
+            "study_design": row.get("study_design", ""),
+            "participants": row.get("participants", ""),
+            "year": valid_year,
+            "language": row.get("language", ""),
+            "methods": row.get("methods", ""),
+            "species": row.get("species", ""),
+        }
+        return check_criteria(record, clean_data.CRITERIA)
+
+    for idx, row in df.iterrows():
+        keep, reason = is_valid_record(row)
+        if keep:
+            valid_rows.append(row.to_dict())
+        else:
+            excluded.append((str(idx), reason))
+            exclusion_reasons[reason] = exclusion_reasons.get(reason, 0) + 1
+    return pd.DataFrame(valid_rows), exclusion_reasons, excluded
+
+def synthetic_frame(n_rows, seed=1472, sample_path=SAMPLE_PATH):
+    with open(sample_path, "r", encoding="utf-8") as f:
+        sample = pd.DataFrame(json.load(f))
+    rng = np.random.default_rng(seed)
+    df = sample.iloc[rng.integers(0, len(sample), n_rows)].reset_index(drop=True)
+    df["year"] = rng.integers(2000, 2028, n_rows)
+    roll = rng.random(n_rows)
+    df.loc[roll < 0.03, "abstract"] = "too short"
+    df.loc[(roll >= 0.03) & (roll < 0.05), "title"] = ""
+    df.loc[(roll >= 0.05) & (roll < 0.07), "year"] = None
+    df.loc[(roll >= 0.07) & (roll < 0.09), "abstract"] = "the and of which were this that there are been being has had"
+    list_rows = df.index[(roll >= 0.09) & (roll < 0.10)]
+    list_abstract = ["list", "abstract", "about", "urban", "freight", "logistics", "delivery", "systems"]
+    df["abstract"] = df["abstract"].astype(object)
+    df.loc[list_rows, "abstract"] = pd.Series([list_abstract] * len(list_rows), index=list_rows, dtype=object)
+    return df
+
+def check_equivalence(df):
+    fast, fast_reasons = clean_data.clean_dataframe(df)
+    slow, slow_reasons, _ = clean_dataframe_rowwise(df)
+    slow = slow.copy()
+    for col in ("abstract", "title"):
+        if col in slow.columns:
+            slow[col] = slow[col].astype(str).str.strip()
+    if "year" in slow.columns:
+        slow["year"] = slow["year"].astype(str).str.extract(r"(\d{4})")
+    pd.testing.assert_frame_equal(fast.reset_index(drop=True), slow.reset_index(drop=True), check_dtype=False)
+    assert fast_reasons == slow_reasons, (fast_reasons, slow_reasons)
+
+def _use_temp_logs():
+    # Keep the decision log and ledger out of the repo while benchmarking
+    log_dir = Path(tempfile.mkdtemp())
+    log_prisma_decision.LOG_PATH = log_dir / "prisma_decisions.jsonl"
+    prisma_ledger.LEDGER_PATH = log_dir / "prisma_ledger.sqlite"
+
+def run(row_counts, reference_max=10_000, check=True):
+    _use_temp_logs()
+    for n in row_counts:
+        df = synthetic_frame(n)
+        start = time.perf_counter()
+        cleaned, reasons = clean_data.clean_dataframe(df)
+        fast = time.perf_counter() - start
+        line = f"{n:>9} rows  vectorized {fast:8.2f}s ({n / fast:10.0f} rows/s)  kept {len(cleaned)}"
+        if n <= reference_max:
+            start = time.perf_counter()
+            clean_dataframe_rowwise(df)
+            slow = time.perf_counter() - start
+            line += f"  row-wise {slow:8.2f}s  speedup x{slow / fast:.1f}"
+            if check:
+                check_equivalence(df)
+                line += "  [equivalent]"
+        print(line)
+
+def _logged_decisions():
+    path = log_prisma_decision.LOG_PATH
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    path.unlink()
+    return [(e["id"], e["stage"], e["decision"], e["reason"]) for e in entries]
+
+def run_scaling(row_counts, worker_counts, chunk_size=clean_data.CHUNK_SIZE, check=True):
+    _use_temp_logs()
+    for n in row_counts:
+        df = synthetic_frame(n)
+        baseline = None
+        for workers in worker_counts:
+            exclusion_reasons = {}
+            start = time.perf_counter()
+            kept = sum(len(c) for c in clean_data.clean_chunks(
+                clean_data.split_frame(df, chunk_size), exclusion_reasons, workers=workers))
+            elapsed = time.perf_counter() - start
+            result = (kept, exclusion_reasons, _logged_decisions())
+            if baseline is None:
+                baseline = (elapsed, result)
+            line = f"{n:>9} rows  workers {workers:>2}  {elapsed:8.2f}s ({n / elapsed:10.0f} rows/s)  scaling x{baseline[0] / elapsed:.2f}"
+            if check:
+                assert result == baseline[1], f"{workers} workers differ from {worker_counts[0]}"
+                line += "  [matches]"
+            print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--reference-max", type=int, default=10_000)
+    parser.add_argument("--no-check", action="store_true")
+    parser.add_argument("--workers", type=int, nargs="+", help="Benchmark parallel screening at these worker counts")
+    parser.add_argument("--chunk-size", type=int, default=clean_data.CHUNK_SIZE)
+    args = parser.parse_args()
+    if args.workers:
+        run_scaling(args.rows, args.workers, args.chunk_size, check=not args.no_check)
+    else:
+        run(args.rows, args.reference_max, check=not args.no_check)
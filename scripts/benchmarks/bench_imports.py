@@ -0,0 +1,141 @@
+"""
+Measures cold import time of the stopword resources and the modules using them.
+
+    python -m scripts.benchmarks.bench_imports --repeat 5
+    python -m scripts.benchmarks.bench_imports --cli
+
+Each statement runs in a fresh interpreter, so every import is cold. The
+"before" rows reproduce how stopwords used to be loaded (NLTK corpus reader
+plus scikit-learn); the frozen sets are also checked against those
+libraries, when installed, so the copies cannot drift unnoticed.
+
+--cli audits the main.py commands instead: `main.py --help` must start
+within STARTUP_CEILING_S, and each command, run on a scratch copy of the
+sample data, may only load the heavy packages listed for it in
+CLI_ALLOWED. Any violation fails the run with a non-zero exit.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+CASES = [
+    ("before: nltk + sklearn stopwords",
+     "from nltk.corpus import stopwords; from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS; "
+     "set(stopwords.words('english')) | ENGLISH_STOP_WORDS"),
+    ("after: nlp_resources.STOP_WORDS", "from scripts.load.nlp_resources import STOP_WORDS"),
+    ("import scripts.clean.clean_data", "import scripts.clean.clean_data"),
+    ("import scripts.analysis.analyze_insights", "import scripts.analysis.analyze_insights"),
+]
+
+def time_import(statement):
+    code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def check_frozen_sets():
+    from scripts.load.nlp_resources import NLTK_STOP_WORDS, SKLEARN_STOP_WORDS
+    try:
+        from nltk.corpus import stopwords
+        assert NLTK_STOP_WORDS == frozenset(stopwords.words("english")), "NLTK stopwords changed"
+        print("NLTK stopwords match the frozen copy")
+    except LookupError:
+        print("NLTK stopwords corpus not downloaded; skipped check")
+    except ImportError:
+        print("nltk not installed; skipped check")
+    try:
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        assert SKLEARN_STOP_WORDS == frozenset(ENGLISH_STOP_WORDS), "scikit-learn stopwords changed"
+        print("scikit-learn stopwords match the frozen copy")
+    except ImportError:
+        print("scikit-learn not installed; skipped check")
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCRATCH_FILES = ["config", "data_sources/raw/mendeley_metadata.json", "data_sources/raw/mendeley_export.ris"]
+STARTUP_CEILING_S = 0.5
+
+# Packages worth keeping off a command's import path
+HEAVY = {
+    "numpy", "pandas", "pyarrow", "scipy", "sklearn", "networkx", "matplotlib", "seaborn",
+    "plotly", "nltk", "sentence_transformers", "torch", "transformers", "alphashape", "shapely",
+}
+# What each command may load in the main process (headless figures render in workers)
+CLI_ALLOWED = {
+    "screen": {"numpy", "pandas", "pyarrow"},
+    "prisma": set(),
+    "keywords": {"numpy", "pandas", "pyarrow", "scipy", "sklearn"},
+    "sweep": {"numpy", "pandas", "pyarrow", "scipy", "sklearn"},
+    "map": {"numpy", "pandas", "pyarrow", "scipy", "sklearn", "networkx"},
+    "authors": {"numpy", "pandas", "pyarrow", "scipy", "sklearn", "networkx", "matplotlib", "sentence_transformers", "torch", "transformers"},
+}
+
+_CLI_RUNNER = """
+import json, runpy, sys
+sys.argv = ["main.py"] + json.loads(sys.argv[1])
+try:
+    runpy.run_path({main!r}, run_name="__main__")
+finally:
+    with open({out!r}, "w") as f:
+        json.dump(sorted({{m.split(".")[0] for m in sys.modules}}), f)
+"""
+
+def run_command(args, cwd, env):
+    """Runs main.py with `args` in `cwd`; returns the top-level packages it loaded."""
+    out = Path(cwd) / "modules.json"
+    code = _CLI_RUNNER.format(main=str(REPO_ROOT / "main.py"), out=str(out))
+    result = subprocess.run([sys.executable, "-c", code, json.dumps(args)], cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stdout[-2000:], result.stderr[-2000:])
+        raise RuntimeError(f"main.py {' '.join(args)} exited with {result.returncode}")
+    return set(json.loads(out.read_text()))
+
+def check_cli(repeat=5):
+    failures = []
+    startup = statistics.median(time_import("from scripts.pipeline.cli import build_parser; build_parser().format_help()") for _ in range(repeat))
+    print(f"{'main.py startup':<20} median {startup * 1000:8.1f} ms (ceiling {STARTUP_CEILING_S * 1000:.0f} ms)")
+    if startup > STARTUP_CEILING_S:
+        failures.append(f"startup took {startup:.2f}s")
+
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT), "ARTIFACT_CACHE": "0", "RENDER_MODE": "files"}
+    with tempfile.TemporaryDirectory() as scratch:
+        for rel in SCRATCH_FILES:
+            src, dst = REPO_ROOT / rel, Path(scratch) / rel
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            if src.is_dir():
+                shutil.copytree(src, dst)
+            else:
+                shutil.copy(src, dst)
+        for command, allowed in CLI_ALLOWED.items():
+            heavy = run_command([command], scratch, env) & HEAVY
+            unexpected = heavy - allowed
+            print(f"{command:<20} loaded {', '.join(sorted(heavy)) or '(no heavy packages)'}")
+            if unexpected:
+                failures.append(f"{command} loaded {', '.join(sorted(unexpected))}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("Import audit passed")
+
+def run(repeat=5):
+    for label, statement in CASES:
+        times = [time_import(statement) for _ in range(repeat)]
+        print(f"{label:<45} median {statistics.median(times) * 1000:8.1f} ms  (min {min(times) * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-check", action="store_true")
+    parser.add_argument("--cli", action="store_true", help="Audit startup time and heavy imports per main.py command")
+    args = parser.parse_args()
+    if args.cli:
+        check_cli(args.repeat)
+        sys.exit(0)
+    if not args.no_check:
+        check_frozen_sets()
+    run(args.repeat)
@@ -0,0 +1,140 @@
+"""
+Drives sync_documents against a local stand-in for the documents endpoint.
+
+    python -m scripts.benchmarks.bench_mendeley_sync --docs 5000 --limit 100
+
+The stand-in is a threaded http.server that paginates with Link headers
+and Mendeley-Count, like the real API. Each scenario checks that every
+document comes back once and in order:
+
+    offset     offset pagination, some pages failing with 503 before succeeding
+    marker     cursor pagination, followed link by link
+    grown      Mendeley-Count understates the library, so the last `next`
+               links fall outside the planned offsets
+    resume     the sync dies part-way, and a second run only fetches what is missing
+"""
+import argparse
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, urlencode
+from scripts.extract import mendeley_manual
+
+class StandInLibrary:
+    """Library contents and the failures the stand-in server injects."""
+
+    def __init__(self, n_docs, mode="offset", flaky_every=0, count_shortfall=0, fail_from=None):
+        self.docs = [{"id": f"doc-{i:06d}", "title": f"Document {i}"} for i in range(n_docs)]
+        self.mode = mode
+        self.flaky_every = flaky_every
+        self.count_shortfall = count_shortfall
+        self.fail_from = fail_from
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failed = set()
+
+    def page(self, query):
+        """(status, body, headers) for one documents request."""
+        limit = int(query.get("limit", ["20"])[0])
+        start = int(query.get("offset", query.get("marker", ["0"]))[0])
+        page_index = start // limit
+        with self.lock:
+            self.requests += 1
+            if self.fail_from is not None and start >= self.fail_from:
+                return 500, [], {}
+            # Flaky pages fail once, then succeed on the adapter's retry
+            if self.flaky_every and page_index % self.flaky_every == 1 and page_index not in self.failed:
+                self.failed.add(page_index)
+                return 503, [], {"Retry-After": "0"}
+
+        body = self.docs[start:start + limit]
+        headers = {"Mendeley-Count": str(max(len(self.docs) - self.count_shortfall, 0))}
+        if start + limit < len(self.docs):
+            key = "marker" if self.mode == "marker" else "offset"
+            next_query = {k: v[0] for k, v in query.items() if k not in ("offset", "marker")}
+            next_query[key] = start + limit
+            headers["Link"] = f'</documents?{urlencode(next_query)}>; rel="next"'
+        return 200, body, headers
+
+def serve(library):
+    """Starts the stand-in on a free local port; returns (server, base url)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path != "/documents":
+                self.send_error(404)
+                return
+            status, body, headers = library.page(parse_qs(parts.query))
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers.items():
+                # Link targets are made absolute, as the real API sends them
+                if name == "Link":
+                    value = value.replace("</", f"<http://{self.headers['Host']}/")
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def _check(label, library, docs, stats=None):
+    ids = [doc["id"] for doc in docs]
+    expected = [doc["id"] for doc in library.docs]
+    status = "ok" if ids == expected else f"MISMATCH ({len(ids)} of {len(expected)} documents)"
+    detail = f"{stats['pages']} pages, {stats['resumed_pages']} resumed, {stats['records_per_sec']} rec/s" if stats else ""
+    print(f"{label:<10} {status:<12} {library.requests:>5} requests  {detail}")
+    return ids == expected
+
+def run_scenario(name, n_docs, limit, max_workers):
+    library = {
+        "offset": lambda: StandInLibrary(n_docs, flaky_every=3),
+        "marker": lambda: StandInLibrary(n_docs, mode="marker", flaky_every=3),
+        "grown": lambda: StandInLibrary(n_docs, count_shortfall=limit * 3 + 1),
+        "resume": lambda: StandInLibrary(n_docs, fail_from=(n_docs // limit // 2) * limit),
+    }[name]()
+    server, base_url = serve(library)
+    checkpoint_dir = tempfile.mkdtemp(prefix="mendeley_sync_")
+    options = dict(base_url=base_url, checkpoint_dir=checkpoint_dir, max_workers=max_workers, limit=limit, backoff=0.01)
+    try:
+        if name != "resume":
+            docs, stats = mendeley_manual.sync_documents("token", **options)
+            return _check(name, library, docs, stats)
+
+        try:
+            mendeley_manual.sync_documents("token", retries=0, **options)
+        except Exception as e:
+            print(f"{'':<10} interrupted as planned: {type(e).__name__}")
+        else:
+            print(f"{name:<10} expected the first run to fail")
+            return False
+        library.fail_from = None
+        docs, stats = mendeley_manual.sync_documents("token", **options)
+        return _check(name, library, docs, stats) and stats["resumed_pages"] > 0
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def run(n_docs=5000, limit=100, max_workers=4, scenarios=("offset", "marker", "grown", "resume")):
+    start = time.perf_counter()
+    results = [run_scenario(name, n_docs, limit, max_workers) for name in scenarios]
+    print(f"{sum(results)}/{len(results)} scenarios passed in {time.perf_counter() - start:.2f}s")
+    return all(results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--scenarios", nargs="+", default=["offset", "marker", "grown", "resume"])
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.docs, args.limit, args.workers, args.scenarios) else 1)
@@ -0,0 +1,58 @@
+"""
+Compares the streaming RIS reader against rispy on a large export.
+
+    python -m scripts.benchmarks.bench_ris --size-mb 300
+
+The sample export is repeated until the target size is reached, so the
+records are realistic Mendeley output.
+"""
+import argparse
+import os
+import tempfile
+import time
+from scripts.extraction.ris_reader import iter_ris, iter_entries
+
+SAMPLE_PATH = "data_sources/raw/mendeley_export.ris"
+
+def build_large_export(target_mb, sample_path=SAMPLE_PATH):
+    with open(sample_path, "r", encoding="utf-8-sig") as f:
+        sample = f.read().rstrip("\n") + "\n\n"
+    fd, path = tempfile.mkstemp(suffix=".ris")
+    target = target_mb * 1024 * 1024
+    written = 0
+    with os.fdopen(fd, "w", encoding="utf-8") as out:
+        while written < target:
+            out.write(sample)
+            written += len(sample.encode("utf-8"))
+    return path
+
+def _time(label, fn, size_mb):
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count:>9} records  {elapsed:8.2f}s  {size_mb / elapsed:8.1f} MB/s  {count / elapsed:10.0f} rec/s")
+
+def run(size_mb=300, skip_rispy=False):
+    path = build_large_export(size_mb)
+    actual_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"Benchmark export: {path} ({actual_mb:.1f} MB)")
+    try:
+        _time("iter_ris (buffered)", lambda: sum(1 for _ in iter_ris(path)), actual_mb)
+        _time("iter_ris (mmap)", lambda: sum(1 for _ in iter_ris(path, use_mmap=True)), actual_mb)
+        _time("iter_ris (AU+AB only)", lambda: sum(1 for _ in iter_ris(path, tags={"AU", "AB"})), actual_mb)
+        _time("iter_entries (rispy shape)", lambda: sum(1 for _ in iter_entries(path)), actual_mb)
+        if not skip_rispy:
+            import rispy
+            def load_rispy():
+                with open(path, "r", encoding="utf-8") as f:
+                    return len(rispy.load(f))
+            _time("rispy.load", load_rispy, actual_mb)
+    finally:
+        os.remove(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=300)
+    parser.add_argument("--skip-rispy", action="store_true")
+    args = parser.parse_args()
+    run(args.size_mb, args.skip_rispy)
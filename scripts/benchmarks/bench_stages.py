@@ -0,0 +1,302 @@
+"""
+Benchmarks every pipeline stage on synthetic corpora and records the results.
+
+    python -m scripts.benchmarks.bench_stages --records 10000 100000 1000000
+    python -m scripts.benchmarks.bench_stages --records 10000 --stages clean_dataframe cluster_keywords
+    python -m scripts.benchmarks.bench_stages --compare            # last two commits
+    python -m scripts.benchmarks.bench_stages --compare abc1234 def5678
+
+Corpora come from synthetic_corpus (seeded, so every run sees the same
+records) and author embeddings use its StubEncoder, so nothing is
+downloaded. Each stage's wall time, throughput and peak memory are
+appended, tagged with the current commit, to a JSON-lines results file;
+--compare prints two commits side by side. Peak memory is the process
+RSS high-water mark, reset before each stage where the kernel allows it
+(tracemalloc's peak otherwise).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from .synthetic_corpus import SEED, SyntheticCorpus, use_stub_encoder
+
+RESULTS_PATH = "data_sources_raw/benchmarks/stage_results.jsonl"
+STAGES = [
+    "clean_dataframe",
+    "tokenize_frame",
+    "cluster_keywords",
+    "cluster_keywords_svd",
+    "stream_cluster_keywords",
+    "stream_cluster_keywords_hashed",
+    "build_graph",
+    "compute_layout",
+    "plot_interactive",
+    "parse_ris",
+    "build_author_matrix",
+    "build_author_embeddings",
+]
+# build_author_matrix builds a dense authors x authors frame
+MAX_MATRIX_AUTHORS = 20_000
+
+def _read_status(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1]) / 1024
+    raise OSError(field)
+
+def _reset_rss_peak():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+@contextmanager
+def measure():
+    """Yields a dict filled with seconds, peak_mb and the memory metric used."""
+    stats = {}
+    rss_peak = _reset_rss_peak()
+    if not rss_peak:
+        import tracemalloc
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats["seconds"] = time.perf_counter() - start
+        if rss_peak:
+            stats["peak_mb"] = round(_read_status("VmHWM:"), 1)
+            stats["memory_metric"] = "rss_hwm"
+        else:
+            import tracemalloc
+            stats["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+            stats["memory_metric"] = "tracemalloc"
+            tracemalloc.stop()
+
+def current_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+def _use_temp_outputs(tmp_dir):
+    # Keep logs, the ledger and figures out of the repo while benchmarking
+    from scripts.analysis import log_prisma_decision, prisma_ledger
+    from scripts.visualize.render import set_render_mode
+    log_prisma_decision.LOG_PATH = tmp_dir / "prisma_decisions.jsonl"
+    prisma_ledger.LEDGER_PATH = tmp_dir / "prisma_ledger.sqlite"
+    set_render_mode(files=True, output_dir=tmp_dir / "figures")
+
+def run_records(n, stages, corpus, tmp_dir):
+    """Runs the selected stages on an `n`-record corpus; yields result rows."""
+    import pandas as pd
+    from scripts.analysis.cluster_keywords import cluster_keywords, fit_keyword_svd, stream_cluster_keywords
+    from scripts.analysis.co_author import build_author_topics as bat
+    from scripts.analysis.co_author.build_author_matrix import build_author_matrix
+    from scripts.analysis.co_author.launch_author_pipeline import load_author_entries
+    from scripts.analysis.name_clusters import name_clusters
+    from scripts.clean import clean_data
+    from scripts.load.load_json import iter_json_chunks
+    from scripts.load.corpus_store import write_corpus
+    from scripts.load.token_store import tokenize_frame
+    from scripts.pipeline import profiling
+    from scripts.pipeline import stages as pipeline_stages
+    from scripts.visualize.vosmapper.compute_layout import compute_layout
+    from scripts.visualize.vosmapper.plot_interactive import plot_interactive
+
+    def result(stage, items, stats, **extra):
+        row = {"stage": stage, "records": n, "items": items, **stats, **extra}
+        row["seconds"] = round(row["seconds"], 4)
+        row["items_per_s"] = round(items / row["seconds"], 1) if row["seconds"] else None
+        iteration = f"  kmeans {row['kmeans_s']:.3f}s / {row['n_iter']} iter" if row.get("n_iter") else ""
+        print(f"{stage:<24} {n:>9} records  {row['seconds']:9.3f}s  {row['items_per_s'] or 0:12.0f} items/s  peak {row['peak_mb']:8.1f} MB{iteration}")
+        return row
+
+    def kmeans_cost():
+        # KMeans time and iterations, from the spans cluster_keywords records
+        spans = {e["name"]: e["args"] for e in profiling.take_events()}
+        kmeans = spans.get("cluster_keywords.kmeans", {})
+        cost = {"kmeans_s": kmeans.get("wall_s"), "n_iter": kmeans.get("n_iter")}
+        if kmeans.get("n_iter"):
+            cost["s_per_iter"] = round(kmeans["wall_s"] / kmeans["n_iter"], 5)
+        return cost
+
+    profiling.enable()
+    wants = set(stages)
+    keyword_stages = {
+        "clean_dataframe", "tokenize_frame", "cluster_keywords", "cluster_keywords_svd", "stream_cluster_keywords",
+        "stream_cluster_keywords_hashed", "build_graph", "compute_layout", "plot_interactive",
+    }
+    author_stages = {"parse_ris", "build_author_matrix", "build_author_embeddings"}
+
+    if wants & keyword_stages:
+        json_path = corpus.write_json(tmp_dir / f"synth_{n}.json", n)
+        df = pd.concat(iter_json_chunks(json_path), ignore_index=True)
+        df["ingestion_source"] = "synthetic"
+
+        with measure() as stats:
+            cleaned, _ = clean_data.clean_dataframe(df)
+        if "clean_dataframe" in wants:
+            yield result("clean_dataframe", len(df), stats, kept=len(cleaned))
+        del df
+
+        with measure() as stats:
+            store = tokenize_frame(cleaned)
+        if "tokenize_frame" in wants:
+            yield result("tokenize_frame", len(cleaned), stats, tokens=len(store.tokens))
+        corpus_path = tmp_dir / f"synth_{n}.parquet"
+        if "stream_cluster_keywords_hashed" in wants:
+            write_corpus(cleaned, corpus_path)
+        del cleaned
+
+        profiling.take_events()
+        with measure() as stats:
+            clusters, filtered_lists = cluster_keywords(
+                token_store=store, fields=pipeline_stages.KEYWORD_FIELDS, n_clusters=pipeline_stages.N_CLUSTERS, return_tokens=True
+            )
+        if "cluster_keywords" in wants:
+            yield result("cluster_keywords", len(store), stats, vocabulary=len(store.vocab), **kmeans_cost())
+
+        # The SVD engine as the pipeline runs it once the reducer is cached; the fit is reported alongside
+        if "cluster_keywords_svd" in wants:
+            fit_start = time.perf_counter()
+            svd = fit_keyword_svd(token_store=store, fields=pipeline_stages.KEYWORD_FIELDS, n_components=pipeline_stages.SVD_COMPONENTS)
+            svd_fit_s = round(time.perf_counter() - fit_start, 4)
+            profiling.take_events()
+            with measure() as stats:
+                cluster_keywords(
+                    token_store=store, fields=pipeline_stages.KEYWORD_FIELDS, n_clusters=pipeline_stages.N_CLUSTERS,
+                    engine="svd", svd=svd,
+                )
+            yield result("cluster_keywords_svd", len(store), stats, vocabulary=len(store.vocab), svd_fit_s=svd_fit_s, **kmeans_cost())
+            del svd
+
+        # Streaming mode, from the token store (fixed vocabulary) and straight from the corpus (hashed)
+        if "stream_cluster_keywords" in wants:
+            with measure() as stats:
+                stream_cluster_keywords(token_store=store, fields=pipeline_stages.KEYWORD_FIELDS, n_clusters=pipeline_stages.N_CLUSTERS)
+            yield result("stream_cluster_keywords", len(store), stats, vocabulary=len(store.vocab))
+        if "stream_cluster_keywords_hashed" in wants:
+            with measure() as stats:
+                stream_cluster_keywords(corpus_path=corpus_path, fields=pipeline_stages.KEYWORD_FIELDS, n_clusters=pipeline_stages.N_CLUSTERS)
+            yield result("stream_cluster_keywords_hashed", len(store), stats)
+        names, colors = name_clusters(clusters)
+        keyword_clusters = {
+            "clusters": clusters,
+            "names": names,
+            "colors": colors,
+            "term_freq": Counter(kw for tokens in filtered_lists for kw in tokens),
+        }
+        del filtered_lists
+
+        # The pipeline's graph stage: build_graph plus node filtering
+        with measure() as stats:
+            keyword_graph = pipeline_stages.keyword_graph(keyword_clusters)
+        G = keyword_graph["graph"]
+        if "build_graph" in wants:
+            yield result("build_graph", G.number_of_nodes(), stats, edges=G.number_of_edges())
+
+        with measure() as stats:
+            pos = compute_layout(G, layout_type=pipeline_stages.LAYOUT_TYPE)
+        if "compute_layout" in wants:
+            yield result("compute_layout", G.number_of_nodes(), stats, layout=pipeline_stages.LAYOUT_TYPE)
+
+        if "plot_interactive" in wants:
+            with measure() as stats:
+                plot_interactive(
+                    G, keyword_graph["term_freq"], pos, sizing_mode="frequency", cluster_colors=colors,
+                    strong_edge_scale=0.5, weak_edge_scale=0.5, edge_threshold=0.1, output_name=f"keyword_map_{n}",
+                )
+            yield result("plot_interactive", G.number_of_nodes(), stats)
+
+    if wants & author_stages:
+        ris_path = corpus.write_ris(tmp_dir / f"synth_{n}.ris", n)
+        with measure() as stats:
+            entries = load_author_entries(ris_path)
+        if "parse_ris" in wants:
+            yield result("parse_ris", len(entries), stats)
+
+        n_authors = len({a for entry in entries for a in entry.get("authors", [])})
+        if "build_author_matrix" in wants:
+            if n_authors > MAX_MATRIX_AUTHORS:
+                gb = n_authors ** 2 * 8 / 2**30
+                print(f"{'build_author_matrix':<24} {n:>9} records  skipped: {n_authors} authors would need a ~{gb:.0f} GB dense matrix")
+                yield {"stage": "build_author_matrix", "records": n, "items": n_authors, "skipped": f"{n_authors} authors"}
+            else:
+                with measure() as stats:
+                    build_author_matrix(entries)
+                yield result("build_author_matrix", len(entries), stats, authors=n_authors)
+
+        if "build_author_embeddings" in wants:
+            use_stub_encoder()
+            with measure() as stats:
+                embeddings = bat.build_author_embeddings(entries)
+            yield result("build_author_embeddings", len(embeddings), stats, encoder="stub")
+
+def run(record_counts, stages=STAGES, seed=SEED, results_path=RESULTS_PATH):
+    corpus = SyntheticCorpus(seed)
+    commit = current_commit()
+    meta = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": seed,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+    results_path = Path(results_path)
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        _use_temp_outputs(tmp_dir)
+        for n in record_counts:
+            for row in run_records(n, stages, corpus, tmp_dir):
+                with results_path.open("a", encoding="utf-8") as f:
+                    f.write(json.dumps({**meta, **row}) + "\n")
+    print(f"Results appended to {results_path} (commit {commit})")
+
+def compare(results_path=RESULTS_PATH, commits=None):
+    """Prints throughput and peak memory per stage for two commits."""
+    with open(results_path, "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    order = list(dict.fromkeys(row["commit"] for row in rows))
+    if commits is None:
+        commits = order[-2:]
+    if len(commits) < 2:
+        print(f"Need results from two commits to compare; have {order}")
+        return
+    base, head = commits
+    latest = {}
+    for row in rows:
+        if "seconds" in row:
+            latest[(row["commit"], row["stage"], row["records"])] = row
+    keys = sorted({(s, n) for c, s, n in latest if c in (base, head)}, key=lambda k: (STAGES.index(k[0]) if k[0] in STAGES else 99, k[1]))
+    print(f"{'stage':<24} {'records':>9}  {base:>14} {head:>14}  speedup   peak MB ({base} → {head})")
+    for stage, n in keys:
+        a, b = latest.get((base, stage, n)), latest.get((head, stage, n))
+        fmt = lambda r: f"{r['items_per_s']:12.0f}/s" if r else f"{'-':>14}"
+        speedup = f"x{b['items_per_s'] / a['items_per_s']:.2f}" if a and b and a["items_per_s"] else "-"
+        peaks = f"{a['peak_mb'] if a else '-'} → {b['peak_mb'] if b else '-'}"
+        print(f"{stage:<24} {n:>9}  {fmt(a)} {fmt(b)}  {speedup:>7}   {peaks}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--results", default=RESULTS_PATH)
+    parser.add_argument("--compare", nargs="*", metavar="COMMIT", help="Compare two commits (default: the last two)")
+    args = parser.parse_args()
+    if args.compare is not None:
+        compare(args.results, args.compare or None)
+    else:
+        run(args.records, args.stages, args.seed, args.results)
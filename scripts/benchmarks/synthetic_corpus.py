@@ -0,0 +1,199 @@
+"""
+Seeded synthetic corpora for benchmarking the pipeline at scale.
+
+    python -m scripts.benchmarks.synthetic_corpus --records 100000 --out /tmp/synth
+
+writes synth.json (Mendeley metadata, as mendeley_metadata.json) and
+synth.ris (as mendeley_export.ris). Words come from the sample corpus:
+each record mixes the background word frequencies (stopwords included)
+with one of `n_topics` Zipf-weighted topic vocabularies, so screening,
+clustering and the keyword graph see realistic text. Abstract lengths,
+author counts, years and keyword coverage follow the sample export; authors
+belong to topic communities with Zipf productivity, so the co-author
+graph has hubs and clusters. A few records are short, untitled, undated
+or duplicated so every screening and deduplication rule fires.
+"""
+import argparse
+import json
+import re
+import zlib
+from collections import Counter, deque
+from pathlib import Path
+import numpy as np
+
+SAMPLE_PATH = "data_sources/raw/mendeley_metadata.json"
+SEED = 1472
+N_TOPICS = 12
+TOPIC_WORDS = 60
+
+# Authors per record in the sample export
+AUTHOR_COUNTS = {1: 24, 2: 14, 3: 19, 4: 4, 5: 4, 6: 3, 7: 2, 8: 1, 9: 1, 10: 1, 18: 1}
+KEYWORD_SHARE = 0.3
+TOPIC_SHARE = 0.4
+TYPES = ["journal", "conference_proceedings", "book_section", "report"]
+
+def _sample_words(sample_path=SAMPLE_PATH):
+    from scripts.load.nlp_resources import STOP_WORDS
+    with open(sample_path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    counts = Counter(
+        word
+        for record in records
+        for word in re.findall(r"\b[a-z]{2,}\b", str(record.get("abstract") or "").lower())
+    )
+    words = sorted(counts)
+    content = [w for w in words if w not in STOP_WORDS and len(w) >= 4]
+    surnames = sorted({a.split(",")[0].split()[-1] for r in records for a in (r.get("authors") or []) if a.strip()})
+    years = np.array([int(r["year"]) for r in records if str(r.get("year") or "").isdigit()])
+    return words, np.array([counts[w] for w in words], dtype=float), content, surnames, years
+
+class SyntheticCorpus:
+    """Generates the same records for the same (seed, n_topics)."""
+
+    def __init__(self, seed=SEED, n_topics=N_TOPICS, sample_path=SAMPLE_PATH):
+        self.seed = seed
+        self.n_topics = n_topics
+        words, counts, content, surnames, years = _sample_words(sample_path)
+        self.years = years if len(years) else np.arange(2015, 2026)
+        rng = np.random.default_rng(seed)
+        self.words = np.array(words, dtype=object)
+        # Cumulative weights, sampled with searchsorted (much faster than rng.choice with p=)
+        self.background_cdf = np.cumsum(counts / counts.sum())
+        index = {w: i for i, w in enumerate(words)}
+        zipf = 1.0 / np.arange(1, TOPIC_WORDS + 1)
+        self.topic_words = [
+            np.array([index[w] for w in rng.choice(content, TOPIC_WORDS, replace=False)]) for _ in range(n_topics)
+        ]
+        self.topic_cdf = np.cumsum(zipf / zipf.sum())
+        self.surnames = surnames or ["Author"]
+        sizes = np.array(sorted(AUTHOR_COUNTS))
+        self.author_sizes = sizes
+        self.author_size_p = np.array([AUTHOR_COUNTS[s] for s in sizes], dtype=float) / sum(AUTHOR_COUNTS.values())
+
+    def _words(self, rng, topic, n):
+        from_topic = rng.random(n) < TOPIC_SHARE
+        ids = np.minimum(np.searchsorted(self.background_cdf, rng.random(n)), len(self.words) - 1)
+        ids[from_topic] = self.topic_words[topic][self._topic_ranks(rng, int(from_topic.sum()))]
+        return self.words[ids]
+
+    def _topic_ranks(self, rng, n):
+        return np.minimum(np.searchsorted(self.topic_cdf, rng.random(n)), TOPIC_WORDS - 1)
+
+    def _author(self, topic, rank):
+        surname = self.surnames[(topic * 7919 + rank) % len(self.surnames)]
+        return f"{surname}{topic}x{rank}, {chr(65 + rank % 26)}."
+
+    def _record(self, rng, i, authors_per_topic):
+        topic = int(rng.integers(self.n_topics))
+        n_words = int(np.clip(rng.lognormal(5.2, 0.5), 5, 800))
+        abstract = " ".join(self._words(rng, topic, n_words)) + "."
+        title_words = self._words(rng, topic, int(rng.integers(6, 15)))
+        title = " ".join(title_words).capitalize()
+        n_authors = int(rng.choice(self.author_sizes, p=self.author_size_p))
+        # Zipf ranks within the topic community, so a few authors are prolific
+        ranks = np.minimum(rng.zipf(1.6, n_authors) - 1, authors_per_topic - 1)
+        authors = list(dict.fromkeys(self._author(topic, int(r)) for r in ranks))
+        keywords = None
+        if rng.random() < KEYWORD_SHARE:
+            terms = self.words[self.topic_words[topic][self._topic_ranks(rng, int(rng.integers(2, 9)))]]
+            keywords = sorted({str(t) for t in terms})
+        year = int(self.years[rng.integers(len(self.years))])
+
+        roll = rng.random()
+        if roll < 0.02:
+            abstract = "n/a"
+        elif roll < 0.03:
+            title = ""
+        elif roll < 0.04:
+            year = None
+        return {
+            "title": title,
+            "authors": authors,
+            "year": year,
+            "type": TYPES[int(rng.integers(len(TYPES)))],
+            "source": f"Journal of {self.words[self.topic_words[topic][0]].capitalize()} Studies",
+            "keywords": keywords,
+            "abstract": abstract,
+            "doi": f"10.5555/synth.{self.seed}.{i}",
+        }
+
+    def records(self, n, duplicate_share=0.01):
+        """Yields `n` records; `duplicate_share` of them repeat a recent one."""
+        rng = np.random.default_rng(self.seed)
+        authors_per_topic = max(10, n // (2 * self.n_topics))
+        recent = deque(maxlen=1000)
+        for i in range(n):
+            if recent and rng.random() < duplicate_share:
+                yield dict(recent[int(rng.integers(len(recent)))])
+                continue
+            record = self._record(rng, i, authors_per_topic)
+            recent.append(record)
+            yield record
+
+    def frame(self, n, duplicate_share=0.0):
+        import pandas as pd
+        return pd.DataFrame(list(self.records(n, duplicate_share)))
+
+    def write_json(self, path, n):
+        """Writes `n` records as a Mendeley metadata JSON array, streaming."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            f.write("[\n")
+            for i, record in enumerate(self.records(n)):
+                f.write(("  " if i == 0 else ",\n  ") + json.dumps(record))
+            f.write("\n]\n")
+        return path
+
+    def write_ris(self, path, n):
+        """Writes `n` records as a RIS export."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            for record in self.records(n):
+                lines = ["TY  - " + ("JOUR" if record["type"] == "journal" else "GEN")]
+                lines += [f"AU  - {author}" for author in record["authors"]]
+                lines.append(f"TI  - {record['title']}")
+                if record["year"] is not None:
+                    lines.append(f"PY  - {record['year']}")
+                lines.append(f"AB  - {record['abstract']}")
+                lines += [f"KW  - {kw}" for kw in record["keywords"] or []]
+                lines.append(f"DO  - {record['doi']}")
+                lines.append("ER  - ")
+                f.write("\n".join(lines) + "\n\n")
+        return path
+
+class StubEncoder:
+    """
+    Deterministic stand-in for SentenceTransformer: a signed hashed bag of
+    words, L2-normalized, with the same output size as all-MiniLM-L6-v2.
+    Texts sharing words get similar vectors, which is enough to exercise
+    clustering and PCA without downloading a model.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def encode(self, text):
+        tokens = re.findall(r"[a-z]{3,}", str(text).lower())
+        hashes = np.fromiter((zlib.crc32(t.encode()) for t in tokens), dtype=np.int64, count=len(tokens))
+        vector = np.zeros(self.dim, dtype=np.float32)
+        np.add.at(vector, hashes % self.dim, np.where(hashes & (1 << 20), 1.0, -1.0))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+def use_stub_encoder(dim=384):
+    """Makes build_author_embeddings use StubEncoder instead of loading a model."""
+    from scripts.analysis.co_author import build_author_topics
+    build_author_topics._sbert_model = StubEncoder(dim)
+    return build_author_topics._sbert_model
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", default="data_sources_raw/benchmarks")
+    args = parser.parse_args()
+    corpus = SyntheticCorpus(args.seed)
+    print(f"Wrote {corpus.write_json(Path(args.out) / 'synth.json', args.records)}")
+    print(f"Wrote {corpus.write_ris(Path(args.out) / 'synth.ris', args.records)}")
@@ -1,16 +1,89 @@
 import json
+import re
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
 
-def load_criteria(path: str) -> Dict[str, Any]:
+def _lowered(values: Any) -> List[str]:
+    return [str(v).lower() for v in values or [] if v]
+
+
+def _compile_terms(patterns: Any) -> re.Pattern | None:
+    """One regex matching any of the (lower-cased) patterns as a substring."""
+    terms = sorted(set(_lowered(patterns)), key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile("|".join(re.escape(t) for t in terms))
+
+
+class CompiledCriteria(dict):
+    """
+    Inclusion/exclusion criteria with the matching work done up front.
+
+    Behaves like the plain criteria dict loaded from JSON, and also holds
+    lower-cased allow/deny sets, parsed year bounds and one combined regex
+    per term list, so a record is scanned once per field group no matter
+    how many terms the config lists.
+    """
+
+    def __init__(self, criteria: Dict[str, Any] | None = None):
+        super().__init__(criteria or {})
+        inc = self.get("inclusion", {}) or {}
+        exc = self.get("exclusion", {}) or {}
+
+        self.exclusion_terms = [
+            ("methods", _compile_terms(exc.get("methodologies")), "excl_methodology"),
+            ("study_design", _compile_terms(exc.get("study_designs")), "excl_study_design"),
+            ("publication_type", _compile_terms(exc.get("publication_types")), "excl_publication_type"),
+            ("species", _compile_terms(exc.get("species")), "excl_species"),
+        ] if exc else []
+
+        self.year_before = None
+        if exc and "year" in exc and exc["year"].get("before"):
+            try:
+                self.year_before = int(exc["year"]["before"])
+            except Exception:
+                pass
+        self.excluded_languages = frozenset(_lowered(exc.get("languages"))) if exc else frozenset()
+
+        self.allowed_designs = frozenset(_lowered(inc.get("study_designs")))
+        self.allowed_pub_types = frozenset(_lowered(inc.get("publication_types")))
+        self.allowed_languages = frozenset(_lowered(inc.get("languages")))
+
+        # Required terms: (fields searched together, matcher, reason)
+        self.required_terms = [
+            (("title", "abstract", "keywords"), _compile_terms(inc.get("comparisons")), "missing_required_comparison"),
+            (("participants", "title", "abstract"), _compile_terms(inc.get("population_terms")), "population_mismatch"),
+        ] if inc else []
+        self.required_terms = [(f, m, r) for f, m, r in self.required_terms if m is not None]
+
+        # Year bounds in check order; a bound that is not a number is None
+        self.requires_year = bool(inc) and "year" in inc
+        self.year_bounds = []
+        if self.requires_year:
+            for key, reason in (("min", "year_too_early"), ("max", "year_too_recent")):
+                bound = inc["year"].get(key)
+                if bound:
+                    try:
+                        self.year_bounds.append((key, int(bound), reason))
+                    except Exception:
+                        self.year_bounds.append((key, None, reason))
+
+
+def compile_criteria(criteria: Dict[str, Any] | None) -> CompiledCriteria:
+    if isinstance(criteria, CompiledCriteria):
+        return criteria
+    return CompiledCriteria(criteria)
+
+
+def load_criteria(path: str) -> CompiledCriteria:
     p = Path(path)
     if not p.exists():
-        return {}
+        return CompiledCriteria()
     try:
-        return json.loads(p.read_text(encoding="utf-8"))
+        return CompiledCriteria(json.loads(p.read_text(encoding="utf-8")))
     except Exception:
-        return {}
+        return CompiledCriteria()
 
 
 def match_any(text: str, patterns: List[str]) -> bool:
@@ -29,99 +102,154 @@ def _normalize_list_field(field: Any) -> str:
     return str(field).lower() if field is not None else ""
 
 
+def _record_year(y: Any) -> int | None:
+    try:
+        if isinstance(y, (int, float)):
+            return int(y)
+        year_str = str(y)
+        if year_str and year_str[:4].isdigit():
+            return int(year_str[:4])
+    except Exception:
+        pass
+    return None
+
+
+# Joins fields searched as one group; no criteria term can span it
+_FIELD_SEP = "\x00"
+
+
 def check_criteria(record: Dict[str, Any], criteria: Dict[str, Any]) -> Tuple[bool, str | None]:
-    """Return (include_bool, reason_or_None)."""
+    """Return (include_bool, reason_or_None).
+
+    `criteria` may be the plain JSON dict or a CompiledCriteria from
+    `load_criteria`; plain dicts are compiled on every call.
+    """
     if not criteria:
         return True, None
+    compiled = compile_criteria(criteria)
 
-    inc = criteria.get("inclusion", {})
-    exc = criteria.get("exclusion", {})
-
-    title = _normalize_list_field(record.get("title", ""))
-    abstract = _normalize_list_field(record.get("abstract", ""))
-    keywords = _normalize_list_field(record.get("keywords", ""))
-    participants = _normalize_list_field(record.get("participants", ""))
-    pub_type = _normalize_list_field(record.get("publication_type", ""))
-    study_design = _normalize_list_field(record.get("study_design", ""))
-    methods = _normalize_list_field(record.get("methods", ""))
-    species = _normalize_list_field(record.get("species", ""))
-    lang = _normalize_list_field(record.get("language", ""))
-
-    # Year handling
-    year_val = None
-    y = record.get("year")
-    try:
-        if isinstance(y, (int, float)):
-            year_val = int(y)
-        else:
-            year_str = str(y)
-            if year_str and year_str[:4].isdigit():
-                year_val = int(year_str[:4])
-    except Exception:
-        year_val = None
+    fields = {}
+
+    def field(name):
+        if name not in fields:
+            fields[name] = _normalize_list_field(record.get(name, ""))
+        return fields[name]
+
+    year_val = _record_year(record.get("year"))
 
     # 1) Exclusion checks first
-    if exc:
-        if match_any(methods, exc.get("methodologies", [])):
-            return False, "excl_methodology"
-        if match_any(study_design, exc.get("study_designs", [])):
-            return False, "excl_study_design"
-        if match_any(pub_type, exc.get("publication_types", [])):
-            return False, "excl_publication_type"
-        if match_any(species, exc.get("species", [])):
-            return False, "excl_species"
-        # year exclusion
-        if "year" in exc and exc["year"].get("before") and year_val is not None:
-            try:
-                if year_val < int(exc["year"]["before"]):
-                    return False, "excl_year_before"
-            except Exception:
-                pass
-        # language exclusion (if specified non-empty, treat as exclusion list)
-        if exc.get("languages"):
-            langs = [l.lower() for l in exc.get("languages", []) if l]
-            if lang and lang in langs:
-                return False, "excl_language"
+    for name, matcher, reason in compiled.exclusion_terms:
+        if matcher is not None and matcher.search(field(name)):
+            return False, reason
+    if compiled.year_before is not None and year_val is not None and year_val < compiled.year_before:
+        return False, "excl_year_before"
+    if compiled.excluded_languages and field("language") in compiled.excluded_languages:
+        return False, "excl_language"
 
     # 2) Inclusion checks
-    if inc:
-        # study designs
-        allowed_designs = [d.lower() for d in inc.get("study_designs", []) if d]
-        if allowed_designs and study_design and study_design not in allowed_designs:
-            return False, "not_allowed_study_design"
-
-        # publication type
-        allowed_pub = [p.lower() for p in inc.get("publication_types", []) if p]
-        if allowed_pub and pub_type and pub_type not in allowed_pub:
-            return False, "not_allowed_pub_type"
-
-        # comparisons
-        comparisons = inc.get("comparisons", []) or []
-        if comparisons and not (match_any(title, comparisons) or match_any(abstract, comparisons) or match_any(keywords, comparisons)):
-            return False, "missing_required_comparison"
-
-        # population
-        pop_terms = inc.get("population_terms", []) or []
-        if pop_terms and not (match_any(participants, pop_terms) or match_any(title, pop_terms) or match_any(abstract, pop_terms)):
-            return False, "population_mismatch"
-
-        # year inclusion bounds
-        if "year" in inc and year_val is not None:
-            y_min = inc["year"].get("min")
-            y_max = inc["year"].get("max")
-            try:
-                if y_min and year_val < int(y_min):
-                    return False, "year_too_early"
-                if y_max and year_val > int(y_max):
-                    return False, "year_too_recent"
-            except Exception:
-                return False, "invalid_year"
-        elif "year" in inc and year_val is None:
+    study_design = field("study_design")
+    if compiled.allowed_designs and study_design and study_design not in compiled.allowed_designs:
+        return False, "not_allowed_study_design"
+    pub_type = field("publication_type")
+    if compiled.allowed_pub_types and pub_type and pub_type not in compiled.allowed_pub_types:
+        return False, "not_allowed_pub_type"
+
+    for names, matcher, reason in compiled.required_terms:
+        if not matcher.search(_FIELD_SEP.join(field(n) for n in names)):
+            return False, reason
+
+    if compiled.requires_year:
+        if year_val is None:
             return False, "invalid_year"
+        for key, bound, reason in compiled.year_bounds:
+            if bound is None:
+                return False, "invalid_year"
+            if (year_val < bound) if key == "min" else (year_val > bound):
+                return False, reason
 
-        # language inclusion
-        allowed_langs = [l.lower() for l in inc.get("languages", []) if l]
-        if allowed_langs and lang and lang not in allowed_langs:
-            return False, "language_mismatch"
+    lang = field("language")
+    if compiled.allowed_languages and lang and lang not in compiled.allowed_languages:
+        return False, "language_mismatch"
 
     return True, None
+
+
+def criteria_reasons(frame, criteria: Dict[str, Any]):
+    """Column-wise check_criteria.
+
+    `frame` holds one record per row, using the same fields `check_criteria`
+    reads from a record dict (missing columns count as empty). Returns a
+    Series with the exclusion reason per row, or None where the record is
+    included; the first failing rule wins, in the same order as
+    `check_criteria`.
+    """
+    import numpy as np
+    import pandas as pd
+
+    reasons = pd.Series([None] * len(frame), index=frame.index, dtype=object)
+    if not criteria or frame.empty:
+        return reasons
+    compiled = compile_criteria(criteria)
+
+    normalized = {}
+
+    def field(name):
+        # Normalized lazily, so fields no rule looks at are never touched
+        if name not in normalized:
+            if name not in frame.columns:
+                normalized[name] = pd.Series("", index=frame.index)
+            else:
+                normalized[name] = frame[name].map(_normalize_list_field)
+        return normalized[name]
+
+    def matches(names, matcher):
+        text = field(names[0])
+        for name in names[1:]:
+            text = text + _FIELD_SEP + field(name)
+        return text.str.contains(matcher.pattern, regex=True)
+
+    years = frame["year"].map(_record_year) if "year" in frame.columns else pd.Series(None, index=frame.index)
+    has_year = years.notna()
+    year_num = pd.to_numeric(years, errors="coerce")
+
+    conditions = []
+
+    # 1) Exclusion checks first
+    for name, matcher, reason in compiled.exclusion_terms:
+        if matcher is not None:
+            conditions.append((matches((name,), matcher), reason))
+    if compiled.year_before is not None:
+        conditions.append((has_year & (year_num < compiled.year_before), "excl_year_before"))
+    if compiled.excluded_languages:
+        conditions.append((field("language").isin(compiled.excluded_languages), "excl_language"))
+
+    # 2) Inclusion checks
+    if compiled.allowed_designs:
+        study_design = field("study_design")
+        conditions.append(((study_design != "") & ~study_design.isin(compiled.allowed_designs), "not_allowed_study_design"))
+    if compiled.allowed_pub_types:
+        pub_type = field("publication_type")
+        conditions.append(((pub_type != "") & ~pub_type.isin(compiled.allowed_pub_types), "not_allowed_pub_type"))
+
+    for names, matcher, reason in compiled.required_terms:
+        conditions.append((~matches(names, matcher), reason))
+
+    if compiled.requires_year:
+        conditions.append((~has_year, "invalid_year"))
+        for key, bound, reason in compiled.year_bounds:
+            if bound is None:
+                conditions.append((has_year, "invalid_year"))
+                break
+            conditions.append((has_year & ((year_num < bound) if key == "min" else (year_num > bound)), reason))
+
+    if compiled.allowed_languages:
+        lang = field("language")
+        conditions.append(((lang != "") & ~lang.isin(compiled.allowed_languages), "language_mismatch"))
+
+    if not conditions:
+        return reasons
+    masks = [mask.fillna(False).to_numpy(dtype=bool) for mask, _ in conditions]
+    labels = [label for _, label in conditions]
+    chosen = np.select(masks, labels, default="")
+    reasons[:] = [r if r else None for r in chosen]
+    return reasons
@@ -1,27 +1,82 @@
-import re
+import os
+import sys
+import numpy as np
 import pandas as pd
 import json
+from contextlib import closing
 from pathlib import Path
-from ..analysis.log_prisma_decision import log_decision
-from .check_criteria import load_criteria, check_criteria
+from ..load.corpus_store import CORPUS_PATH, corpus_writer, export_json
+from ..load.load_json import CHUNK_SIZE, iter_json_array, iter_json_chunks
+from ..load import nlp_resources
+from ..load.token_store import TEXT_FIELDS, TERM_FIELDS, as_text, tokenize_frame, token_store_writer
+from .deduplicate import find_duplicates, write_duplicate_summary
+from ..analysis.log_prisma_decision import DecisionLogWriter, log_decisions
+from ..analysis import prisma_ledger
+from ..pipeline.profiling import span
+from .check_criteria import load_criteria, criteria_reasons
 
 # Load inclusion/exclusion criteria from config
 CRITERIA = load_criteria("config/inclusion_exclusion.json")
 
-# Stopword setup (match cluster_keywords behavior)
-try:
-    from nltk.corpus import stopwords
-    # Attempt to access to ensure resource is present
-    _ = stopwords.words("english")
-except Exception:
-    import nltk
-    nltk.download("stopwords")
-    from nltk.corpus import stopwords
+# Stopwords (same frozen set cluster_keywords uses)
+STOP_WORDS = nlp_resources.STOP_WORDS
 
-from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
-STOP_WORDS = set(stopwords.words("english")) | ENGLISH_STOP_WORDS
+# Screening thresholds
+MIN_ABSTRACT_LENGTH = 30
+MIN_TOPICAL_TOKENS = 5
 
-def clean_dataframe(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+def _column(df, name):
+    if name in df.columns:
+        return df[name]
+    return pd.Series("", index=df.index, dtype=object)
+
+def screening_reasons(df: pd.DataFrame, return_tokens: bool = False):
+    """
+    Returns the PRISMA screening exclusion reason for every row (None when
+    the row is kept), computed column by column. Rules apply in order:
+    abstract, title, year, topical tokens, then inclusion/exclusion criteria.
+
+    Rows that pass the first three rules are tokenized once into a
+    TokenStore; with `return_tokens` it is returned too, aligned with the
+    rows of `df` (rows excluded before tokenizing have no tokens).
+    """
+    abstract = _column(df, "abstract").map(lambda v: as_text(v, join_lists=True)).str.strip()
+    title = _column(df, "title").map(lambda v: as_text(v, join_lists=False)).str.strip()
+    year = _column(df, "year").map(str).str.extract(r"(\d{4})", expand=False)
+
+    reasons = pd.Series([None] * len(df), index=df.index, dtype=object)
+    short_abstract = abstract.str.len() < MIN_ABSTRACT_LENGTH
+    missing_title = ~short_abstract & (title == "")
+    invalid_year = ~short_abstract & ~missing_title & year.isna()
+    reasons[short_abstract] = "Missing or short abstract"
+    reasons[missing_title] = "Missing title"
+    reasons[invalid_year] = "Invalid or missing year"
+
+    pending = reasons.isna()
+    fields = {"title": title.where(pending, ""), "abstract": abstract.where(pending, "")}
+    for name in TERM_FIELDS:
+        fields[name] = _column(df, name).where(pending, None)
+    tokens = tokenize_frame(pd.DataFrame(fields, index=df.index))
+
+    topical = pd.Series(tokens.doc_lengths(TEXT_FIELDS, exclude=STOP_WORDS), index=df.index)
+    too_few = pending & (topical < MIN_TOPICAL_TOKENS)
+    reasons[too_few] = [f"Not enough topical tokens ({n})" for n in topical[too_few]]
+
+    pending = reasons.isna()
+    if pending.any():
+        # Records for the criteria checks (cleaned title/abstract, extracted year)
+        record_fields = ["keywords", "publication_type", "study_design", "participants", "language", "methods", "species"]
+        records = pd.DataFrame({"title": title[pending], "abstract": abstract[pending], "year": year[pending]})
+        for name in record_fields:
+            records[name] = _column(df, name)[pending]
+        criteria = criteria_reasons(records, CRITERIA)
+        reasons[criteria.index] = criteria
+
+    if return_tokens:
+        return reasons, tokens
+    return reasons
+
+def clean_dataframe(df: pd.DataFrame, reasons: pd.Series | None = None, log: DecisionLogWriter | None = None) -> tuple[pd.DataFrame, dict]:
     """
     Cleans a DataFrame by:
     - Dropping rows with missing or short abstracts
@@ -29,83 +84,29 @@ def clean_dataframe(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
     - Replacing semicolons with commas in 'tags'
     - Extracting 4-digit years from 'year'
     Also logs PRISMA screening exclusions and returns exclusion reasons.
+    The frame's index is used as the record id, so chunks cut from a larger
+    corpus should keep their original index. `reasons` can be passed in when
+    screening already ran elsewhere (e.g. in a worker process), and `log`
+    to buffer exclusions in an open DecisionLogWriter.
     """
-    df = df.copy()
-    valid_rows = []
+    if reasons is None:
+        reasons = screening_reasons(df)
+    keep = reasons.isna()
+
+    excluded = []
     exclusion_reasons = {}
+    for idx, reason in reasons[~keep].items():
+        excluded.append((str(idx), reason))
+        exclusion_reasons[reason] = exclusion_reasons.get(reason, 0) + 1
+
+    if log is not None:
+        log.log_many(excluded, stage="screening", decision="exclude_irrelevant")
+    else:
+        log_decisions(excluded, stage="screening", decision="exclude_irrelevant")
 
-    def is_valid_record(row):
-        abstract = row.get("abstract", "")
-        title = row.get("title", "")
-        year = row.get("year", "")
-
-        # Normalize abstract
-        if isinstance(abstract, list):
-            abstract = " ".join(map(str, abstract))
-        if not isinstance(abstract, str):
-            abstract = str(abstract)
-        abstract = abstract.strip()
-
-        # Normalize title
-        if not isinstance(title, str):
-            title = str(title)
-        title = title.strip()
-
-        # Extract year
-        year_str = str(year)
-        year_match = pd.Series(year_str).str.extract(r"(\d{4})")[0]
-        valid_year = year_match.iloc[0] if not year_match.isna().iloc[0] else None
-
-        # Apply filters
-        # Basic presence checks
-        if abstract == "" or len(abstract) < 30:
-            return False, "Missing or short abstract"
-        if title == "":
-            return False, "Missing title"
-        if valid_year is None:
-            return False, "Invalid or missing year"
-
-        # Build token list from title + abstract (same tokenization as cluster_keywords)
-        combined = f"{title} {abstract}".lower()
-        tokens = re.findall(r"\b[a-zA-Z]{3,}\b", combined)
-        filtered_tokens = [t for t in tokens if t not in STOP_WORDS]
-
-        # Require a minimum number of topical tokens to be present so the record
-        # can participate meaningfully in keyword clustering.
-        MIN_TOPICAL_TOKENS = 5
-        if len(filtered_tokens) < MIN_TOPICAL_TOKENS:
-            return False, f"Not enough topical tokens ({len(filtered_tokens)})"
-
-        # Build a small record dict to run criteria checks (does not mutate row)
-        record = {
-            "title": title,
-            "abstract": abstract,
-            "keywords": row.get("keywords", []),
-            "publication_type": row.get("publication_type", ""),
-            "study_design": row.get("study_design", ""),
-            "participants": row.get("participants", ""),
-            "year": valid_year,
-            "language": row.get("language", ""),
-            "methods": row.get("methods", ""),
-            "species": row.get("species", "")
-        }
-
-        ok, reason = check_criteria(record, CRITERIA)
-        if not ok:
-            return False, reason
-
-        return True, None
-
-    for idx, row in df.iterrows():
-        keep, reason = is_valid_record(row)
-        if keep:
-            row_dict = row.to_dict()
-            valid_rows.append(row_dict)
-        else:
-            log_decision(record_id=str(idx), stage="screening", decision="exclude_irrelevant", reason=reason)
-            exclusion_reasons[reason] = exclusion_reasons.get(reason, 0) + 1
-
-    df_cleaned = pd.DataFrame(valid_rows)
+    if not keep.any():
+        return pd.DataFrame(), exclusion_reasons
+    df_cleaned = df[keep].reset_index(drop=True)
 
     # Final cleanup
     if "abstract" in df_cleaned.columns:
@@ -119,25 +120,161 @@ def clean_dataframe(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
 
     return df_cleaned, exclusion_reasons
 
+def split_frame(df: pd.DataFrame, chunk_size: int = CHUNK_SIZE):
+    """Yields `chunk_size`-row slices of `df`, keeping the original index."""
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+def screen_chunks(chunks, workers=1):
+    """
+    Yields (chunk, screening reasons, token store) triples in input order.
+
+    With workers > 1 the screening runs in a process pool. Each worker
+    imports this module once, so the stopword set and compiled criteria
+    are loaded once per worker rather than per chunk. At most two chunks
+    per worker are in flight, which keeps streaming input bounded.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield (chunk, *screening_reasons(chunk, return_tokens=True))
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(screening_reasons, chunk, True)))
+            if len(pending) >= 2 * workers:
+                chunk, future = pending.popleft()
+                yield (chunk, *future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield (chunk, *future.result())
+
+def clean_chunks(chunks, exclusion_reasons=None, workers=1, log=None, add_tokens=None):
+    """
+    Screens an iterable of DataFrame chunks, yielding each cleaned chunk.
+
+    Exclusion counts are accumulated into `exclusion_reasons` (a dict, updated
+    in place) so only a few chunks are held in memory at a time. Decisions
+    are logged here, in chunk order, so the PRISMA log and counts are the
+    same for any number of workers. Pass an open DecisionLogWriter as `log`
+    to share it with other stages; otherwise one is opened for the screen
+    and synced when it finishes. `add_tokens`, if given, receives the
+    TokenStore of each cleaned chunk's rows (see token_store_writer).
+    """
+    if exclusion_reasons is None:
+        exclusion_reasons = {}
+    if log is None:
+        with DecisionLogWriter() as log:
+            yield from clean_chunks(chunks, exclusion_reasons, workers=workers, log=log, add_tokens=add_tokens)
+        return
+    for chunk, chunk_reasons, tokens in screen_chunks(chunks, workers=workers):
+        cleaned, reasons = clean_dataframe(chunk, chunk_reasons, log=log)
+        if add_tokens is not None:
+            add_tokens(tokens.take(np.flatnonzero(chunk_reasons.isna().to_numpy())))
+        for reason, count in reasons.items():
+            exclusion_reasons[reason] = exclusion_reasons.get(reason, 0) + count
+        yield cleaned
+
 theme_map_name = "logistics_review"
 
+INPUT_PATH = "data_sources/raw/mendeley_metadata.json"
+JSON_EXPORT_PATH = "data_sources/raw/cleaned_metadata.json"
+EXCLUSION_PATH = "data_sources_raw/logs/prisma_exclusions.json"
+
+def run_clean(input_path=INPUT_PATH, output_path=CORPUS_PATH, chunk_size=CHUNK_SIZE, workers=1, export=False):
+    """
+    Runs identification (deduplication) and screening over the Mendeley
+    metadata, writing the Parquet corpus, its token store and the PRISMA
+    logs. Returns a summary of the run, or None if the input is missing.
+    """
+    input_path = Path(input_path)
+    output_path = Path(output_path)
+    exclusion_path = Path(EXCLUSION_PATH)
+
+    if not input_path.exists():
+        print(f"Input file not found: {input_path}")
+        return None
+
+    # One decision log for both stages, fsynced at each stage boundary
+    with closing(prisma_ledger.connect()) as ledger, DecisionLogWriter() as decision_log:
+        # Re-running the clean replaces its stages in the ledger
+        prisma_ledger.clear_stages(["identification", "screening"], ledger)
+
+        # Identification: drop exact (DOI / title+year) and near (MinHash) duplicates
+        identified = {"n": 0}
+        # Every field seen in the input, so each chunk carries the full corpus schema
+        fields = {}
+        def identified_records():
+            for i, record in enumerate(iter_json_array(input_path)):
+                identified["n"] = i + 1
+                if isinstance(record, dict):
+                    fields.update(dict.fromkeys(record))
+                yield str(i), record
+        with span("clean.identification") as s:
+            merges = find_duplicates(identified_records())
+            records_identified = s["records"] = identified["n"]
+            s["duplicates"] = len(merges)
+        decision_log.log_many(
+            [(dup_id, f"duplicate of {kept_id} ({method})") for dup_id, kept_id, method in merges],
+            stage="identification",
+            decision="exclude_duplicate",
+        )
+        decision_log.sync()
+        prisma_ledger.set_stage_total("identification", "records_identified", records_identified, ledger)
+        summary = write_duplicate_summary(records_identified, merges)
+        print(f"Removed {summary['duplicates_removed']} duplicates of {records_identified} records")
+        duplicate_ids = {int(dup_id) for dup_id, _, _ in merges}
+
+        def tagged_chunks():
+            for chunk in iter_json_chunks(input_path, chunksize=chunk_size):
+                chunk = chunk.drop(index=[i for i in chunk.index if i in duplicate_ids]).reindex(columns=list(fields))
+                chunk["ingestion_source"] = "mendeley_api"
+                yield chunk
+
+        # Stream the metadata through screening so peak memory follows the chunk size.
+        # Tokens from screening are kept for the cleaned rows, so later stages
+        # read the token store instead of tokenizing the corpus again.
+        exclusion_reasons = {}
+        with span("clean.screening", workers=workers) as s:
+            s["records_kept"] = 0
+            with token_store_writer(corpus_path=output_path) as add_tokens, corpus_writer(output_path) as write:
+                for cleaned in clean_chunks(tagged_chunks(), exclusion_reasons, workers=workers, log=decision_log, add_tokens=add_tokens):
+                    write(cleaned)
+                    s["records_kept"] += len(cleaned)
+            s["records_excluded"] = sum(exclusion_reasons.values())
+    print(f"Cleaned data saved to {output_path}")
+
+    # The indented JSON copy is only an export now; stages read the Parquet corpus
+    if export:
+        export_json(output_path, JSON_EXPORT_PATH)
+        print(f"JSON export saved to {JSON_EXPORT_PATH}")
+
+    exclusion_path.parent.mkdir(parents=True, exist_ok=True)
+    with exclusion_path.open("w", encoding="utf-8") as f:
+        json.dump(exclusion_reasons, f, indent=2)
+    print(f"Exclusion summary saved to {exclusion_path}")
+
+    return {
+        "corpus_path": str(output_path),
+        "records_identified": records_identified,
+        "duplicates_removed": summary["duplicates_removed"],
+        "exclusion_reasons": exclusion_reasons,
+    }
+
+def clean_workers():
+    """Screening worker count from CLEAN_WORKERS (default 1, i.e. serial)."""
+    return int(os.environ.get("CLEAN_WORKERS", "1"))
+
 if __name__ == "__main__":
-    input_path = Path("data_sources/raw/mendeley_metadata.json")
-    output_path = Path("data_sources/raw/cleaned_metadata.json")
-    exclusion_path = Path("data_sources_raw/logs/prisma_exclusions.json")
-
-    if input_path.exists():
-        df = pd.read_json(input_path)
-        df["ingestion_source"] = "mendeley_api"
-
-        cleaned, exclusion_reasons = clean_dataframe(df)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        cleaned.to_json(output_path, orient="records", indent=2)
-        print(f"Cleaned data saved to {output_path}")
-
-        exclusion_path.parent.mkdir(parents=True, exist_ok=True)
-        with exclusion_path.open("w", encoding="utf-8") as f:
-            json.dump(exclusion_reasons, f, indent=2)
-        print(f"Exclusion summary saved to {exclusion_path}")
-    else:
-        print(f"Input file not found: {input_path}")
\ No newline at end of file
+    chunk_size = CHUNK_SIZE
+    if "--chunk-size" in sys.argv:
+        chunk_size = int(sys.argv[sys.argv.index("--chunk-size") + 1])
+    workers = clean_workers()
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+
+    run_clean(chunk_size=chunk_size, workers=workers, export="--export-json" in sys.argv)
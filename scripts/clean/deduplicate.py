@@ -0,0 +1,244 @@
+import json
+import re
+import zlib
+from collections import defaultdict
+from pathlib import Path
+import numpy as np
+
+DUPLICATES_PATH = Path("data_sources_raw/logs/prisma_duplicates.json")
+
+NUM_PERM = 64          # MinHash signature length
+BANDS = 16             # LSH bands (NUM_PERM / BANDS rows per band)
+SHINGLE_SIZE = 3       # Word shingles
+NEAR_THRESHOLD = 0.8   # Estimated Jaccard needed to call two records duplicates
+MAX_BUCKET_PAIRS = 50  # Larger buckets are only compared against their first member
+_PRIME = (1 << 31) - 1
+_BATCH = 2000
+_MAX_SHINGLES = 100_000  # Bounds the (NUM_PERM x shingles) hash matrix per slice
+
+def normalize_doi(doi):
+    if not doi or not isinstance(doi, str):
+        return None
+    doi = doi.strip().lower()
+    doi = re.sub(r"^(https?://(dx\.)?doi\.org/|doi:\s*)", "", doi)
+    return doi or None
+
+def normalize_title(title):
+    if not title or not isinstance(title, str):
+        return None
+    title = re.sub(r"[^a-z0-9]+", " ", title.lower()).strip()
+    return title or None
+
+def _field(record, *names):
+    for name in names:
+        value = record.get(name)
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if value is not None and not (isinstance(value, float) and value != value):
+            return value
+    return None
+
+def _year(record):
+    match = re.search(r"\d{4}", str(_field(record, "year", "publication_year") or ""))
+    return match.group(0) if match else None
+
+def _completeness(record):
+    return sum(1 for v in record.values() if v not in (None, "", []) and not (isinstance(v, float) and v != v))
+
+def _shingle_hashes(text):
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return np.empty(0, dtype=np.int64)
+    shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) & _PRIME for s in shingles), dtype=np.int64, count=len(shingles))
+
+def _permutations(num_perm=NUM_PERM, seed=1472):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, size=num_perm, dtype=np.int64)
+    b = rng.integers(0, _PRIME, size=num_perm, dtype=np.int64)
+    return a, b
+
+def minhash_signatures(texts, num_perm=NUM_PERM, seed=1472):
+    """
+    Computes MinHash signatures for a batch of texts in one vectorized pass.
+
+    Returns a (len(texts), num_perm) uint32 array. Texts too short to
+    shingle get an all-max signature and never collide.
+    """
+    a, b = _permutations(num_perm, seed)
+    hashes = [_shingle_hashes(t or "") for t in texts]
+    signatures = np.full((len(texts), num_perm), _PRIME, dtype=np.int64)
+    filled = [i for i, h in enumerate(hashes) if len(h)]
+
+    start = 0
+    while start < len(filled):
+        # Take as many documents as fit under the shingle budget (at least one)
+        end, total = start, 0
+        while end < len(filled) and (end == start or total + len(hashes[filled[end]]) <= _MAX_SHINGLES):
+            total += len(hashes[filled[end]])
+            end += 1
+        rows = filled[start:end]
+        flat = np.concatenate([hashes[i] for i in rows])
+        offsets = np.concatenate(([0], np.cumsum([len(hashes[i]) for i in rows])[:-1]))
+        permuted = (a[:, None] * flat[None, :] + b[:, None]) % _PRIME
+        signatures[rows] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        start = end
+    return signatures.astype(np.uint32)
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+            return True
+        return False
+
+def _lsh_pairs(signatures, bands=BANDS):
+    rows = signatures.shape[1] // bands
+    for band in range(bands):
+        buckets = defaultdict(list)
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for i, key in enumerate(block):
+            if key[0] != _PRIME:
+                buckets[key.tobytes()].append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) <= MAX_BUCKET_PAIRS:
+                for x in range(len(members)):
+                    for y in range(x + 1, len(members)):
+                        yield members[x], members[y]
+            else:
+                for other in members[1:]:
+                    yield members[0], other
+
+def find_duplicates(records, near_threshold=NEAR_THRESHOLD):
+    """
+    Finds duplicate records in one streaming pass plus an LSH join.
+
+    Parameters:
+        records (iterable): (record_id, dict) pairs; dicts may use Mendeley
+            (title/abstract/doi/year) or rispy field names.
+        near_threshold (float): Minimum estimated Jaccard similarity of
+            title+abstract shingles for a near-duplicate match.
+
+    Returns:
+        list of (duplicate_id, kept_id, method) tuples, where method is
+        "doi", "title" or "minhash". In each duplicate group the record with
+        the most filled-in fields is kept (earliest on ties).
+
+    Exact matches use hash indexes on normalized DOI and normalized
+    title+year; near-duplicates are found by banding MinHash signatures,
+    so only records that share a band bucket are ever compared. Title and
+    MinHash matches never merge groups whose records carry different DOIs
+    (two "Editorial"s of the same year are different papers).
+    """
+    ids = []
+    dois = []
+    scores = []
+    doi_index = {}
+    title_index = {}
+    exact = []
+    signature_blocks = []
+    pending = []
+
+    def flush():
+        if pending:
+            signature_blocks.append(minhash_signatures(pending))
+            pending.clear()
+
+    for i, (record_id, record) in enumerate(records):
+        ids.append(record_id)
+        scores.append(_completeness(record))
+        title = _field(record, "title", "primary_title")
+        doi = normalize_doi(_field(record, "doi"))
+        dois.append(doi)
+        title_key = normalize_title(title)
+
+        if doi is not None:
+            if doi in doi_index:
+                exact.append((doi_index[doi], i, "doi"))
+            else:
+                doi_index[doi] = i
+        if title_key is not None:
+            key = (title_key, _year(record))
+            if key in title_index:
+                exact.append((title_index[key], i, "title"))
+            else:
+                title_index[key] = i
+
+        pending.append(f"{title or ''} {_field(record, 'abstract') or ''}")
+        if len(pending) >= _BATCH:
+            flush()
+    flush()
+
+    uf = _UnionFind(len(ids))
+    methods = {}
+    # The DOI each group carries, if any of its records has one
+    group_doi = list(dois)
+
+    def merge(i, j, method):
+        ri, rj = uf.find(i), uf.find(j)
+        if ri == rj:
+            return False
+        if method != "doi" and group_doi[ri] and group_doi[rj] and group_doi[ri] != group_doi[rj]:
+            return False
+        uf.union(ri, rj)
+        group_doi[uf.find(ri)] = group_doi[ri] or group_doi[rj]
+        return True
+
+    for i, j, method in exact:
+        if merge(i, j, method):
+            methods[j] = method
+
+    if signature_blocks:
+        signatures = np.concatenate(signature_blocks)
+        for i, j in _lsh_pairs(signatures):
+            if uf.find(i) == uf.find(j):
+                continue
+            if np.mean(signatures[i] == signatures[j]) >= near_threshold and merge(i, j, "minhash"):
+                methods[max(i, j)] = "minhash"
+
+    groups = defaultdict(list)
+    for i in range(len(ids)):
+        groups[uf.find(i)].append(i)
+
+    merges = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        keep = max(members, key=lambda m: (scores[m], -m))
+        for m in members:
+            if m != keep:
+                merges.append((m, keep, methods.get(m, methods.get(keep, "minhash"))))
+    merges.sort()
+    return [(ids[m], ids[keep], method) for m, keep, method in merges]
+
+def deduplicate_records(entries, near_threshold=NEAR_THRESHOLD):
+    """Returns `entries` (a list of dicts) without duplicates, preserving order."""
+    merges = find_duplicates(enumerate(entries), near_threshold=near_threshold)
+    dropped = {dup for dup, _, _ in merges}
+    return [e for i, e in enumerate(entries) if i not in dropped]
+
+def write_duplicate_summary(records_identified, merges, path=DUPLICATES_PATH):
+    by_method = defaultdict(int)
+    for _, _, method in merges:
+        by_method[method] += 1
+    summary = {
+        "records_identified": records_identified,
+        "duplicates_removed": len(merges),
+        "by_method": dict(by_method),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
@@ -1,13 +1,36 @@
 import requests
 import os
 import json
+import shutil
+import threading
+import time
+import argparse
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qs, urlencode
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+if __package__:
+    from .mendeley_store import STORE_PATH, CHANGES_PATH, load_store, save_store, merge_documents, save_changes
+else:
+    # Run as `python scripts/extract/mendeley_manual.py`: this directory is on sys.path
+    from mendeley_store import STORE_PATH, CHANGES_PATH, load_store, save_store, merge_documents, save_changes
 
 CLIENT_ID = os.getenv("MENDELEY_CLIENT_ID", "21265")
 CLIENT_SECRET = os.getenv("MENDELEY_CLIENT_SECRET", "xOxlONQTqXwhMFKl")
 REDIRECT_URI = "http://localhost:8080"
 
+# Base URL is overridable so the sync can be pointed at a local stand-in server
+API_BASE = os.getenv("MENDELEY_API_BASE", "https://api.mendeley.com")
+PAGE_LIMIT = 500  # Largest page size the documents endpoint accepts
+CHECKPOINT_DIR = "data_sources/raw/.mendeley_sync"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Delta windows start this far before the sync, so clock skew cannot skip edits
+SYNC_OVERLAP = timedelta(minutes=5)
+
 def get_access_token(code):
-    token_url = "https://api.mendeley.com/oauth/token"
+    token_url = f"{API_BASE}/oauth/token"
     payload = {
         "grant_type": "authorization_code",
         "code": code,
@@ -20,17 +43,295 @@ def get_access_token(code):
     response.raise_for_status()
     return response.json()["access_token"]
 
-def fetch_documents(token):
+def make_session(max_workers=4, retries=5, backoff=0.5):
+    """
+    Builds a pooled session whose adapter retries idempotent GETs with
+    exponential backoff (honouring Retry-After on 429/503).
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(max_workers, 1), max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _canonical_url(url):
+    """Sorts query parameters so the same page always maps to the same key."""
+    if url is None:
+        return None
+    parts = urlsplit(url)
+    query = sorted(parse_qs(parts.query).items())
+    return urlunsplit(parts._replace(query=urlencode(query, doseq=True)))
+
+def _offset_page_urls(next_url, total, limit):
+    """
+    If the API paginates by offset, every remaining page URL can be derived
+    from the first `next` link, which lets pages be fetched concurrently.
+    Cursor (marker) pagination returns None and is followed link by link.
+    """
+    parts = urlsplit(next_url)
+    query = parse_qs(parts.query)
+    if "offset" not in query or not total:
+        return None
+    start = int(query["offset"][0])
+    step = int(query.get("limit", [limit])[0])
+    urls = []
+    for offset in range(start, total, step):
+        query["offset"] = [str(offset)]
+        urls.append(urlunsplit(parts._replace(query=urlencode(query, doseq=True))))
+    return urls
+
+def _write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def _load_checkpoint(checkpoint_dir, first_url):
+    state_path = os.path.join(checkpoint_dir, "state.json")
+    if os.path.exists(state_path):
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        # A checkpoint from a different query cannot be resumed
+        if state.get("first_url") == first_url:
+            return state
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    return {"first_url": first_url, "pages": {}}
+
+def _fetch_page(session, url, headers, on_headers, retries=5, backoff=0.5):
+    """
+    Fetches one page. `on_headers` is called as soon as the status line and
+    headers arrive, so the next request can be scheduled while this body is
+    still downloading. Body-read failures are retried with the same backoff
+    the adapter applies to connection and status errors.
+    """
+    for attempt in range(retries + 1):
+        response = session.get(url, headers=headers, stream=True, timeout=60)
+        try:
+            response.raise_for_status()
+            if attempt == 0:
+                on_headers(response)
+            return response.json(), response.links.get("next", {}).get("url")
+        except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError):
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt))
+        finally:
+            response.close()
+
+def sync_documents(
+    token,
+    base_url=None,
+    checkpoint_dir=CHECKPOINT_DIR,
+    max_workers=4,
+    limit=PAGE_LIMIT,
+    params=None,
+    session=None,
+    retries=5,
+    backoff=0.5,
+):
+    """
+    Pulls every page of the documents endpoint by following its Link headers.
+
+    Parameters:
+        token (str): OAuth access token.
+        base_url (str): API root (defaults to API_BASE).
+        checkpoint_dir (str): Where finished pages are stored for resuming.
+        max_workers (int): Maximum number of pages in flight at once.
+        limit (int): Page size requested from the API.
+        params (dict): Extra query parameters (e.g. modified_since).
+        session (requests.Session): Optional pre-built pooled session.
+
+    Returns:
+        docs (list): All documents, in page order.
+        stats (dict): Pages/records fetched, elapsed seconds, pages/sec and records/sec,
+            and `server_time`, the earliest server Date seen, also across resumes
+            (None if nothing was fetched).
+
+    Every finished page is written to `checkpoint_dir` together with the link
+    to the page after it. If the sync is interrupted, re-running it walks the
+    saved chain and only requests the pages that are missing. The checkpoint
+    is removed once the whole library has been pulled.
+    """
+    base_url = (base_url or API_BASE).rstrip("/")
+    query = {"view": "all", "limit": limit}
+    query.update(params or {})
+    first_url = _canonical_url(f"{base_url}/documents?{urlencode(query)}")
     headers = {"Authorization": f"Bearer {token}"}
-    url = "https://api.mendeley.com/documents?view=all&limit=500"
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    session = session or make_session(max_workers, retries, backoff)
+
+    state = _load_checkpoint(checkpoint_dir, first_url)
+    pages = state["pages"]
+    state_path = os.path.join(checkpoint_dir, "state.json")
+    lock = threading.Lock()
+    futures = {}
+    planned = {"offset": False}
+    fetched = {"pages": 0, "records": 0}
+
+    # Walk the already checkpointed chain to find where to resume
+    url = first_url
+    while url in pages:
+        url = pages[url]["next"]
+    resumed_pages = len(pages)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+
+        def submit(page_url):
+            page_url = _canonical_url(page_url)
+            with lock:
+                if page_url in futures or page_url in pages:
+                    return
+                futures[page_url] = executor.submit(run, page_url)
+
+        def on_headers(response):
+            try:
+                server_time = parsedate_to_datetime(response.headers["Date"])
+            except (KeyError, TypeError, ValueError):
+                server_time = None
+            if server_time is not None:
+                with lock:
+                    # Kept in the checkpoint so a resumed sync reports when it really began
+                    earliest = state.get("server_time")
+                    if earliest is None or server_time < datetime.fromisoformat(earliest):
+                        state["server_time"] = server_time.isoformat()
+            next_url = response.links.get("next", {}).get("url")
+            if not next_url:
+                return
+            with lock:
+                already_planned = planned["offset"]
+            if already_planned:
+                return
+            total = int(response.headers.get("Mendeley-Count", 0) or 0)
+            urls = _offset_page_urls(next_url, total, limit)
+            if urls:
+                with lock:
+                    planned["offset"] = True
+                for page_url in urls:
+                    submit(page_url)
+            else:
+                submit(next_url)
+
+        def run(page_url):
+            docs, next_url = _fetch_page(session, page_url, headers, on_headers, retries, backoff)
+            with lock:
+                file_name = f"page_{len(pages):05d}.json"
+                _write_json_atomic(os.path.join(checkpoint_dir, file_name), docs)
+                pages[page_url] = {"file": file_name, "next": _canonical_url(next_url), "count": len(docs)}
+                _write_json_atomic(state_path, state)
+                fetched["pages"] += 1
+                fetched["records"] += len(docs)
+            return next_url
+
+        if url is not None:
+            # Offset pages past a resume point are re-planned from the
+            # first fresh response, skipping those already on disk.
+            while url is not None:
+                with lock:
+                    future = futures.get(url)
+                    done = url in pages
+                if future is None and not done:
+                    # A `next` link outside the planned offsets (e.g. the
+                    # library grew past Mendeley-Count mid-sync)
+                    submit(url)
+                    continue
+                if future is not None:
+                    future.result()
+                url = pages[url]["next"]
+
+    elapsed = time.perf_counter() - start
+
+    docs = []
+    url = first_url
+    while url is not None:
+        page = pages[url]
+        with open(os.path.join(checkpoint_dir, page["file"]), "r", encoding="utf-8") as f:
+            docs.extend(json.load(f))
+        url = page["next"]
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+    stats = {
+        "pages": fetched["pages"],
+        "records": fetched["records"],
+        "resumed_pages": resumed_pages,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(fetched["pages"] / elapsed, 2) if elapsed > 0 else 0.0,
+        "records_per_sec": round(fetched["records"] / elapsed, 2) if elapsed > 0 else 0.0,
+        "server_time": datetime.fromisoformat(state["server_time"]) if state.get("server_time") else None,
+    }
+    print(
+        f"📥 Synced {len(docs)} documents ({stats['pages']} pages fetched, "
+        f"{resumed_pages} resumed) in {stats['seconds']}s: "
+        f"{stats['pages_per_sec']} pages/s, {stats['records_per_sec']} records/s"
+    )
+    return docs, stats
+
+def fetch_documents(token, **kwargs):
+    docs, _ = sync_documents(token, **kwargs)
+    return docs
+
+def delta_sync(token, store_path=STORE_PATH, changes_path=CHANGES_PATH, **kwargs):
+    """
+    Refreshes the local document store with only what changed upstream.
+
+    The first run pulls the full library. Later runs ask the API for documents
+    modified since the stored sync timestamp and for ids deleted since then,
+    and merge both into the store. The change set (added/updated/deleted ids)
+    is written to `changes_path` so downstream stages can see which records
+    moved. Returns the store's documents and the change set.
+    """
+    store = load_store(store_path)
+    # Take the timestamp before requesting so edits made mid-sync are picked up next time
+    local_time = datetime.now(timezone.utc)
+    checkpoint_dir = kwargs.pop("checkpoint_dir", CHECKPOINT_DIR)
+
+    if store["last_sync"] is None:
+        modified, stats = sync_documents(token, checkpoint_dir=checkpoint_dir, **kwargs)
+        deleted_ids = []
+    else:
+        since = store["last_sync"]
+        modified, stats = sync_documents(
+            token,
+            params={"modified_since": since},
+            checkpoint_dir=os.path.join(checkpoint_dir, "modified"),
+            **kwargs,
+        )
+        deleted, _ = sync_documents(
+            token,
+            params={"deleted_since": since},
+            checkpoint_dir=os.path.join(checkpoint_dir, "deleted"),
+            **kwargs,
+        )
+        deleted_ids = [doc.get("id") for doc in deleted]
+
+    # The server's clock decides what counts as modified, so the next window
+    # starts from its Date (the local clock if no page was fetched), minus
+    # an overlap; documents seen twice merge by id.
+    started = stats["server_time"] or local_time
+    sync_time = (started - SYNC_OVERLAP).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+    changes = merge_documents(store, modified, deleted_ids)
+    store["last_sync"] = sync_time
+    save_store(store, store_path)
+    save_changes(changes, sync_time, changes_path)
+    print(
+        f"🔄 Delta sync: {len(changes['added'])} added, {len(changes['updated'])} updated, "
+        f"{len(changes['deleted'])} deleted ({len(store['documents'])} in store)"
+    )
+    return list(store["documents"].values()), changes
 
 def extract_metadata(docs):
     metadata = []
     for doc in docs:
         entry = {
+            "id": doc.get("id"),
+            "doi": (doc.get("identifiers") or {}).get("doi"),
             "title": doc.get("title"),
             "authors": [a.get("last_name") for a in doc.get("authors", [])],
             "year": doc.get("year"),
@@ -50,11 +351,19 @@ def save_metadata(metadata, path):
     print(f"\n📁 Saved to {path}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pull the Mendeley library into data_sources/raw.")
+    parser.add_argument("--delta", action="store_true", help="Only fetch documents changed since the last sync")
+    args = parser.parse_args()
+
     print("🔗 Authorize here:")
-    print(f"https://api.mendeley.com/oauth/authorize?response_type=code&client_id={CLIENT_ID}&redirect_uri={REDIRECT_URI}&scope=all")
+    print(f"{API_BASE}/oauth/authorize?response_type=code&client_id={CLIENT_ID}&redirect_uri={REDIRECT_URI}&scope=all")
     redirect_url = input("Paste the full redirect URL: ")
     code = redirect_url.split("code=")[-1].split("&")[0]
     token = get_access_token(code)
-    docs = fetch_documents(token)
+    max_workers = int(os.getenv("MENDELEY_SYNC_WORKERS", "4"))
+    if args.delta:
+        docs, _ = delta_sync(token, max_workers=max_workers)
+    else:
+        docs = fetch_documents(token, max_workers=max_workers)
     metadata = extract_metadata(docs)
-    save_metadata(metadata, "data_sources/raw/mendeley_metadata.json")
\ No newline at end of file
+    save_metadata(metadata, "data_sources/raw/mendeley_metadata.json")
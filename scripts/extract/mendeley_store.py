@@ -0,0 +1,74 @@
+import json
+import os
+
+STORE_PATH = "data_sources/raw/mendeley_store.json"
+CHANGES_PATH = "data_sources/raw/mendeley_changes.json"
+
+def load_store(path=STORE_PATH):
+    """
+    Loads the local document store.
+
+    The store keeps every raw Mendeley document keyed by its id, the version
+    (last_modified) seen for each one, and the timestamp of the last sync.
+    """
+    if not os.path.exists(path):
+        return {"last_sync": None, "documents": {}, "versions": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        store = json.load(f)
+    store.setdefault("last_sync", None)
+    store.setdefault("documents", {})
+    store.setdefault("versions", {})
+    return store
+
+def save_store(store, path=STORE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(store, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def document_version(doc):
+    return doc.get("last_modified") or doc.get("etag")
+
+def merge_documents(store, modified_docs, deleted_ids=()):
+    """
+    Applies a delta to the store in place.
+
+    Returns a change set with the ids that were added, updated and deleted.
+    Documents whose version matches the stored one are left untouched.
+    """
+    documents = store["documents"]
+    versions = store["versions"]
+    changes = {"added": [], "updated": [], "deleted": []}
+
+    for doc in modified_docs:
+        doc_id = doc.get("id")
+        if not doc_id:
+            continue
+        version = document_version(doc)
+        if doc_id not in documents:
+            changes["added"].append(doc_id)
+        elif version is None or versions.get(doc_id) != version:
+            changes["updated"].append(doc_id)
+        else:
+            continue
+        documents[doc_id] = doc
+        versions[doc_id] = version
+
+    for doc_id in deleted_ids:
+        if doc_id in documents:
+            del documents[doc_id]
+            versions.pop(doc_id, None)
+            changes["deleted"].append(doc_id)
+
+    # A document edited and then deleted inside one window is only reported as deleted
+    deleted = set(changes["deleted"])
+    changes["added"] = [d for d in changes["added"] if d not in deleted]
+    changes["updated"] = [d for d in changes["updated"] if d not in deleted]
+
+    return changes
+
+def save_changes(changes, sync_time, path=CHANGES_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"synced_at": sync_time, **changes}, f, indent=2)
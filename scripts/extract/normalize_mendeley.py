@@ -1,21 +1,23 @@
 import json
 import re
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
+if __package__:
+    from ..load.nlp_resources import NLTK_STOP_WORDS as stop_words, stem
+else:
+    # Run as `python scripts/extract/normalize_mendeley.py`: import from the repository root
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from scripts.load.nlp_resources import NLTK_STOP_WORDS as stop_words, stem
 
 # Load metadata
 with open("data_sources/raw/mendeley_metadata.json", "r", encoding="utf-8") as f:
     metadata = json.load(f)
 
-# Setup
-stemmer = PorterStemmer()
-stop_words = set(stopwords.words("english"))
-
 def clean_text(text):
     if not text:
         return []
     tokens = re.findall(r"\b\w+\b", text.lower())
-    return [stemmer.stem(t) for t in tokens if t not in stop_words]
+    return [stem(t) for t in tokens if t not in stop_words]
 
 # Normalize entries
 normalized = []
@@ -25,7 +27,7 @@ for entry in metadata:
     keywords = entry.get("keywords") or []
 
     abstract_tokens = clean_text(abstract)
-    keyword_tokens = [stemmer.stem(k.lower()) for k in keywords if isinstance(k, str)]
+    keyword_tokens = [stem(k.lower()) for k in keywords if isinstance(k, str)]
 
     normalized.append({
         "title": title,
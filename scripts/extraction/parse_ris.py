@@ -1,35 +1,16 @@
 import pandas as pd
+from .ris_reader import iter_ris
 
-def parse_ris(filepath):
-    with open(filepath, encoding="utf-8") as f:
-        lines = f.readlines()
+# RIS tag -> output column
+FIELDS = {"TI": "title", "AB": "abstract", "PY": "year", "KW": "tags"}
 
-    records = []
-    record = {}
-    for line in lines:
-        if line.strip() == "":
-            continue
-        if line.startswith("TY  -"):
-            record = {}
-        elif line.startswith("ER  -"):
-            records.append(record)
-        else:
-            tag, _, value = line.partition("  - ")
-            tag = tag.strip()
-            value = value.strip()
-            if tag in record:
-                record[tag] += "; " + value
-            else:
-                record[tag] = value
-
-    df = pd.DataFrame([{
-        "title": r.get("TI", ""),
-        "abstract": r.get("AB", ""),
-        "year": r.get("PY", ""),
-        "tags": r.get("KW", "")
-    } for r in records])
-
-    return df
+def parse_ris(filepath, use_mmap=False):
+    records = iter_ris(filepath, tags=FIELDS, use_mmap=use_mmap)
+    rows = (
+        {column: "; ".join(r.get(tag, [])) for tag, column in FIELDS.items()}
+        for r in records
+    )
+    return pd.DataFrame(rows, columns=list(FIELDS.values()))
 
 if __name__ == "__main__":
     print("parse_ris is importable and working.")
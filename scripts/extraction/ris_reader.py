@@ -0,0 +1,155 @@
+import mmap
+from contextlib import contextmanager
+
+# RIS tag -> field name, following rispy's naming so existing callers
+# that expect `authors`, `abstract`, `title` etc. keep working.
+TAG_NAMES = {
+    "TY": "type_of_reference",
+    "A1": "first_authors",
+    "A2": "secondary_authors",
+    "A3": "tertiary_authors",
+    "A4": "subsidiary_authors",
+    "AB": "abstract",
+    "AD": "author_address",
+    "AN": "accession_number",
+    "AU": "authors",
+    "CY": "place_published",
+    "DA": "date",
+    "DB": "name_of_database",
+    "DO": "doi",
+    "DP": "database_provider",
+    "EP": "end_page",
+    "ET": "edition",
+    "ID": "id",
+    "IS": "number",
+    "J2": "alternate_title1",
+    "JA": "alternate_title2",
+    "JF": "alternate_title3",
+    "JO": "journal_name",
+    "KW": "keywords",
+    "LA": "language",
+    "M3": "type_of_work",
+    "N1": "notes",
+    "N2": "notes_abstract",
+    "PB": "publisher",
+    "PY": "year",
+    "SN": "issn",
+    "SP": "start_page",
+    "ST": "short_title",
+    "T1": "primary_title",
+    "T2": "secondary_title",
+    "T3": "tertiary_title",
+    "TI": "title",
+    "UR": "urls",
+    "VL": "volume",
+    "Y1": "publication_year",
+    "Y2": "access_date",
+}
+
+# Tags that legitimately repeat within a record
+LIST_TAGS = frozenset({"A1", "A2", "A3", "A4", "AU", "KW", "N1", "UR"})
+
+def _split_line(line):
+    # Same tag test rispy uses: two upper-case characters followed by "  -"
+    if line[2:5] == "  -" and line[:2].isupper() and line[0:1].isalpha():
+        return line[0:2], line[6:].strip()
+    return None, line.strip()
+
+@contextmanager
+def _open_lines(source, use_mmap=False, encoding="utf-8"):
+    """Yields an iterator of decoded lines from a path or an open text file."""
+    if hasattr(source, "readline"):
+        yield iter(source)
+        return
+
+    if not use_mmap:
+        # utf-8-sig drops the byte-order mark some exporters prepend
+        with open(source, "r", encoding="utf-8-sig" if encoding == "utf-8" else encoding) as f:
+            yield iter(f)
+        return
+
+    with open(source, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            yield iter(())
+            return
+        try:
+            if mm[:3] == b"\xef\xbb\xbf":
+                mm.seek(3)
+            yield (raw.decode(encoding, errors="replace") for raw in iter(mm.readline, b""))
+        finally:
+            mm.close()
+
+def iter_ris(source, tags=None, use_mmap=False, encoding="utf-8"):
+    """
+    Streams RIS records one at a time in a single pass.
+
+    Parameters:
+        source (str | Path | file): Path to a RIS file or an open text file.
+        tags (iterable): Only keep these tags (e.g. {"TI", "AB"}); None keeps all.
+        use_mmap (bool): Read the file through a memory map instead of buffered IO.
+        encoding (str): File encoding.
+
+    Yields:
+        dict: Tag → list of values. Repeated tags keep every value in order;
+        continuation lines are joined onto the value they belong to.
+    """
+    keep = frozenset(tags) if tags is not None else None
+
+    with _open_lines(source, use_mmap=use_mmap, encoding=encoding) as lines:
+        record = None
+        last_tag = None
+        for line in lines:
+            tag, value = _split_line(line)
+
+            if record is None:
+                if tag == "TY":
+                    record = {"TY": [value]} if keep is None or "TY" in keep else {}
+                    last_tag = "TY"
+                continue
+
+            if tag == "ER":
+                yield record
+                record = None
+                last_tag = None
+                continue
+
+            if tag is None:
+                # Continuation of the previous tag; blank lines carry nothing
+                if not value or last_tag is None or last_tag not in record:
+                    continue
+                if last_tag in LIST_TAGS:
+                    record[last_tag].append(value)
+                else:
+                    values = record[last_tag]
+                    values[-1] = f"{values[-1]} {value}" if values[-1] else value
+                continue
+
+            last_tag = tag
+            if keep is not None and tag not in keep:
+                continue
+            record.setdefault(tag, []).append(value)
+
+def to_entry(record):
+    """
+    Converts a raw `iter_ris` record into a rispy-style entry: named fields,
+    lists for repeatable tags and the first value for single-valued ones.
+    """
+    entry = {}
+    for tag, values in record.items():
+        name = TAG_NAMES.get(tag)
+        if name is None:
+            entry.setdefault("unknown_tag", {})[tag] = list(values)
+        elif tag == "UR":
+            entry[name] = [u.strip() for v in values for u in v.split(";") if u.strip()]
+        elif tag in LIST_TAGS:
+            entry[name] = list(values)
+        else:
+            entry[name] = values[0]
+    return entry
+
+def iter_entries(source, tags=None, use_mmap=False, encoding="utf-8"):
+    for record in iter_ris(source, tags=tags, use_mmap=use_mmap, encoding=encoding):
+        yield to_entry(record)
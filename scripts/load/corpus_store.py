@@ -0,0 +1,221 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+# Columnar working format handed between pipeline stages
+CORPUS_PATH = "data_sources/raw/cleaned_metadata.parquet"
+ROW_GROUP_SIZE = 10_000
+# Rows held back while waiting to type columns that are all-null so far
+MAX_PENDING_ROWS = 100_000
+
+def _is_null(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+def _normalize_value(value):
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    if _is_null(value):
+        return None
+    return str(value)
+
+def _normalize_list_value(value):
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    if _is_null(value):
+        return None
+    return [str(value)]
+
+def _normalize_frame(df):
+    """
+    Parquet needs one type per column, while JSON-sourced frames mix
+    None, scalars and lists in object columns. Object columns become
+    strings, or lists of strings (scalars wrapped) if any value is a list.
+    All-null columns are left untyped.
+    """
+    df = df.reset_index(drop=True)
+    for col in df.columns:
+        if df[col].isna().all():
+            # Untyped: a column missing from this chunk, not a float column
+            df[col] = [None] * len(df)
+        elif df[col].dtype == object:
+            has_list = df[col].map(lambda v: isinstance(v, (list, tuple))).any()
+            df[col] = df[col].map(_normalize_list_value if has_list else _normalize_value)
+    return df
+
+def _infer_schema(schemas):
+    """
+    The columns of the pending frames in order of first appearance, each
+    typed from the first frame that has values for it. Integer columns are
+    widened to float64 so a later chunk with missing values still fits.
+    Returns the schema and the names of columns still all-null.
+    """
+    import pyarrow as pa
+
+    fields, unresolved = {}, []
+    for schema in schemas:
+        for field in schema.remove_metadata():
+            if field.name not in fields or pa.types.is_null(fields[field.name].type):
+                fields[field.name] = field
+    for name, field in fields.items():
+        if pa.types.is_integer(field.type):
+            fields[name] = pa.field(name, pa.float64())
+        elif pa.types.is_null(field.type):
+            unresolved.append(name)
+    return pa.schema(list(fields.values())), unresolved
+
+def _coerce_to_schema(df, schema):
+    """Aligns a chunk with the corpus schema."""
+    import pyarrow as pa
+
+    unknown = [col for col in df.columns if col not in schema.names]
+    if unknown:
+        raise ValueError(f"Columns {unknown} are not in the corpus schema fixed by earlier chunks")
+    for field in schema:
+        if field.name not in df.columns:
+            df[field.name] = None
+        elif pa.types.is_list(field.type):
+            df[field.name] = df[field.name].map(lambda v: None if _is_null(v) else v if isinstance(v, list) else [v])
+        elif pa.types.is_string(field.type):
+            df[field.name] = df[field.name].map(lambda v: "; ".join(v) if isinstance(v, list) else v)
+    return pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+@contextmanager
+def corpus_writer(path=CORPUS_PATH, row_group_size=ROW_GROUP_SIZE, max_pending_rows=MAX_PENDING_ROWS):
+    """
+    Yields a `write(df)` function that appends frames to a Parquet corpus.
+
+    The frames written before the file is opened fix the schema; each call
+    writes one or more row groups, so a corpus can be produced chunk by
+    chunk. Columns that are all-null so far take their type from later
+    frames: frames are held back until every such column has been seen
+    with values, or `max_pending_rows` are pending, after which the rest
+    become strings. Integers are stored as float64, and a column first
+    seen once the file is open raises ValueError.
+    The file is written to a temporary path and moved into place on a
+    clean exit.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    state = {"writer": None, "schema": None, "pending": [], "pending_schemas": [], "pending_rows": 0}
+
+    def flush():
+        schema, _ = _infer_schema(state["pending_schemas"])
+        state["schema"] = pa.schema([
+            pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+            for f in schema
+        ])
+        state["writer"] = pq.ParquetWriter(tmp_path, state["schema"])
+        for df in state["pending"]:
+            state["writer"].write_table(_coerce_to_schema(df, state["schema"]), row_group_size=row_group_size)
+        state["pending"], state["pending_schemas"] = [], []
+
+    def write(df):
+        if len(df) == 0:
+            return
+        df = _normalize_frame(df)
+        if state["writer"] is not None:
+            state["writer"].write_table(_coerce_to_schema(df, state["schema"]), row_group_size=row_group_size)
+            return
+        state["pending"].append(df)
+        state["pending_schemas"].append(pa.Schema.from_pandas(df, preserve_index=False))
+        state["pending_rows"] += len(df)
+        _, unresolved = _infer_schema(state["pending_schemas"])
+        if not unresolved or state["pending_rows"] >= max_pending_rows:
+            flush()
+
+    try:
+        yield write
+        if state["pending"]:
+            flush()
+    except BaseException:
+        if state["writer"] is not None:
+            state["writer"].close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    if state["writer"] is None:
+        # Nothing written: still leave a valid, empty corpus behind
+        pq.write_table(pa.table({}), tmp_path)
+    else:
+        state["writer"].close()
+    tmp_path.replace(path)
+
+def write_corpus(df, path=CORPUS_PATH, row_group_size=ROW_GROUP_SIZE):
+    with corpus_writer(path, row_group_size) as write:
+        write(df)
+
+def corpus_columns(path=CORPUS_PATH):
+    import pyarrow.parquet as pq
+    return pq.read_schema(path).names
+
+def _project(path, columns):
+    if columns is None:
+        return None
+    available = set(corpus_columns(path))
+    return [c for c in columns if c in available]
+
+def _to_frame(table):
+    """Converts to pandas, keeping list columns as Python lists rather than arrays."""
+    import pyarrow as pa
+    df = table.to_pandas()
+    for field in table.schema:
+        if pa.types.is_list(field.type):
+            df[field.name] = table.column(field.name).to_pylist()
+    return df
+
+def read_corpus(path=CORPUS_PATH, columns=None):
+    """
+    Reads the corpus into a DataFrame, decoding only `columns` (missing
+    ones are skipped so callers can ask for optional fields).
+    """
+    import pyarrow.parquet as pq
+    table = pq.read_table(path, columns=_project(path, columns))
+    return _to_frame(table)
+
+def iter_corpus(path=CORPUS_PATH, columns=None, batch_size=None):
+    """
+    Streams the corpus as DataFrames, one row group at a time or in
+    `batch_size`-row batches, so memory is bounded by the batch.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    parquet = pq.ParquetFile(path)
+    projected = _project(path, columns)
+    if batch_size:
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=projected):
+            yield _to_frame(pa.Table.from_batches([batch]))
+    else:
+        for i in range(parquet.num_row_groups):
+            yield _to_frame(parquet.read_row_group(i, columns=projected))
+
+def count_rows(path=CORPUS_PATH, column=None, value=None):
+    """
+    Counts rows from the footer metadata, or the rows where `column == value`
+    by decoding that single column.
+    """
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    if column is None:
+        return pq.ParquetFile(path).metadata.num_rows
+    if column not in corpus_columns(path):
+        return 0
+    values = pq.read_table(path, columns=[column]).column(column)
+    return int(pc.sum(pc.equal(values, value)).as_py() or 0)
+
+def corpus_version(path=CORPUS_PATH):
+    """Content hash of the corpus file, used to tie derived artifacts to it."""
+    import hashlib
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def export_json(path=CORPUS_PATH, output_path="data_sources/raw/cleaned_metadata.json"):
+    """Writes the corpus out as the indented JSON the pipeline used to hand around."""
+    df = read_corpus(path)
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    df.to_json(output_path, orient="records", indent=2)
+    return output_path
@@ -1,7 +1,124 @@
 import pandas as pd
 import json
 
-def load_mendeley_json(path):
+CHUNK_SIZE = 5000
+_WHITESPACE = " \t\r\n"
+# What may follow a complete array element
+_DELIMITERS = _WHITESPACE + ",]"
+
+def iter_json_array(path, buffer_size=1 << 20):
+    """
+    Yields the elements of a top-level JSON array one at a time.
+
+    The file is read in `buffer_size` pieces and decoded incrementally, so
+    memory stays proportional to the largest single element rather than
+    the whole file.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill(size=buffer_size):
+            nonlocal buf, pos, eof
+            data = f.read(size)
+            if not data:
+                eof = True
+            buf = buf[pos:] + data
+            pos = 0
+
+        def skip(chars):
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in chars:
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        skip(_WHITESPACE)
+        if pos >= len(buf):
+            return
+        if buf[pos] != "[":
+            raise ValueError(f"{path} does not contain a top-level JSON array")
+        pos += 1
+
+        skip(_WHITESPACE)
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        while True:
+            skip(_WHITESPACE)
+            if pos >= len(buf):
+                raise ValueError(f"Unterminated JSON array in {path}")
+            if buf[pos] in ",]":
+                raise ValueError(f"Expected a value at {buf[pos]!r} in {path}")
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # A scalar cut at the buffer edge (e.g. "1." of "1.5") can
+                # still decode; only accept it once a delimiter follows
+                if not eof and (end == len(buf) or buf[end] not in _DELIMITERS):
+                    raise json.JSONDecodeError("Element reaches buffer edge", buf, end)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Grow geometrically so a large element is not re-decoded many times
+                fill(max(buffer_size, len(buf) - pos))
+                continue
+            pos = end
+            yield value
+
+            # Exactly one comma between elements
+            skip(_WHITESPACE)
+            if pos >= len(buf):
+                raise ValueError(f"Unterminated JSON array in {path}")
+            if buf[pos] == "]":
+                return
+            if buf[pos] != ",":
+                raise ValueError(f"Expected ',' or ']' at {buf[pos]!r} in {path}")
+            pos += 1
+
+def iter_json_chunks(path, chunksize=CHUNK_SIZE, buffer_size=1 << 20):
+    """
+    Yields DataFrames of at most `chunksize` records from a JSON array file.
+
+    Each chunk keeps its position in the file as its index, so row ids match
+    those of a frame built from the whole file.
+    """
+    rows = []
+    offset = 0
+    for record in iter_json_array(path, buffer_size=buffer_size):
+        rows.append(record)
+        if len(rows) >= chunksize:
+            yield pd.DataFrame(rows, index=pd.RangeIndex(offset, offset + len(rows)))
+            offset += len(rows)
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows, index=pd.RangeIndex(offset, offset + len(rows)))
+
+def load_mendeley_json(path, columns=None, chunksize=None):
+    """
+    Loads a metadata corpus into a DataFrame.
+
+    `.parquet` corpora are read column-projected, so only `columns` are
+    decoded; JSON files are parsed and then projected. With `chunksize`,
+    JSON input is streamed and an iterator of DataFrame chunks is returned.
+    """
+    if str(path).endswith(".parquet"):
+        from .corpus_store import read_corpus, iter_corpus
+        if chunksize:
+            return iter_corpus(path, columns=columns, batch_size=chunksize)
+        return read_corpus(path, columns=columns)
+
+    if chunksize:
+        def project(chunks):
+            for chunk in chunks:
+                yield chunk[[c for c in columns if c in chunk.columns]] if columns is not None else chunk
+        return project(iter_json_chunks(path, chunksize=chunksize))
+
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
-    return pd.DataFrame(data)
\ No newline at end of file
+    df = pd.DataFrame(data)
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
@@ -0,0 +1,252 @@
+import json
+import re
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+from .corpus_store import CORPUS_PATH, corpus_version, iter_corpus
+
+# Integer-encoded tokens for the cleaned corpus, built once per corpus version
+TOKEN_STORE_PATH = "data_sources/raw/token_store.npz"
+
+# Runs of 3+ letters, the tokenization screening and keyword clustering share
+TOKEN_PATTERN = r"\b[a-zA-Z]{3,}\b"
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+# Text fields are split into words; term fields keep each listed term whole
+TEXT_FIELDS = ("title", "abstract")
+TERM_FIELDS = ("keywords", "subject_area")
+FIELDS = TEXT_FIELDS + TERM_FIELDS
+
+def as_text(value, join_lists=True):
+    if join_lists and isinstance(value, list):
+        return " ".join(map(str, value))
+    return value if isinstance(value, str) else str(value)
+
+def tokenize_terms(value):
+    if isinstance(value, list):
+        return [str(v).strip().lower() for v in value]
+    if isinstance(value, str):
+        return _TOKEN_RE.findall(value.lower())
+    return []
+
+class TokenStore:
+    """
+    A tokenized corpus in CSR layout.
+
+    `tokens` is one flat int32 array of vocabulary ids. Each document has one
+    segment per field, and `offsets[d * len(fields) + f]` is where field `f`
+    of document `d` starts (the next offset is where it ends), so a document
+    or a field is a slice of `tokens` and no strings are kept per document.
+    """
+
+    def __init__(self, vocab, tokens, offsets, fields=FIELDS, corpus_version=None):
+        self.vocab = list(vocab)
+        self.tokens = np.asarray(tokens, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.fields = tuple(fields)
+        self.corpus_version = corpus_version
+
+    def __len__(self):
+        return (len(self.offsets) - 1) // len(self.fields)
+
+    def _vocab_mask(self, words):
+        words = words if isinstance(words, (set, frozenset)) else set(words)
+        return np.fromiter((w in words for w in self.vocab), dtype=bool, count=len(self.vocab))
+
+    def select(self, fields=None, exclude=None):
+        """
+        Returns (ids, doc_offsets) for `fields` of every document, dropping
+        tokens whose vocabulary entry is in `exclude` (e.g. stopwords).
+        """
+        fields = self.fields if fields is None else tuple(fields)
+        n_fields = len(self.fields)
+        wanted = np.isin(np.arange(n_fields), [self.fields.index(f) for f in fields if f in self.fields])
+        segment = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        keep = wanted[segment % n_fields]
+        if exclude:
+            keep &= ~self._vocab_mask(exclude)[self.tokens]
+        ids = self.tokens[keep]
+        counts = np.bincount(segment[keep] // n_fields, minlength=len(self))
+        doc_offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(counts, out=doc_offsets[1:])
+        return ids, doc_offsets
+
+    def doc_lengths(self, fields=None, exclude=None):
+        _, doc_offsets = self.select(fields, exclude)
+        return np.diff(doc_offsets)
+
+    def token_lists(self, fields=None, exclude=None):
+        ids, doc_offsets = self.select(fields, exclude)
+        words = np.array(self.vocab, dtype=object)[ids].tolist()
+        return [words[doc_offsets[i]:doc_offsets[i + 1]] for i in range(len(self))]
+
+    def term_counts(self, fields=None, exclude=None):
+        """Corpus frequency of every term in `fields`, as {term: count}."""
+        ids, _ = self.select(fields, exclude)
+        counts = np.bincount(ids, minlength=len(self.vocab))
+        return {self.vocab[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    def take(self, rows):
+        """Returns a store with only documents `rows` (positions), in that order."""
+        rows = np.asarray(rows, dtype=np.int64)
+        n_fields = len(self.fields)
+        segments = (rows[:, None] * n_fields + np.arange(n_fields)).ravel()
+        starts, ends = self.offsets[segments], self.offsets[segments + 1]
+        lengths = ends - starts
+        offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # Gather every selected segment in one pass
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return TokenStore(self.vocab, self.tokens[positions], offsets, self.fields)
+
+    def save(self, path=TOKEN_STORE_PATH, corpus_version=None):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if corpus_version is not None:
+            self.corpus_version = corpus_version
+        meta = {"fields": list(self.fields), "corpus_version": self.corpus_version}
+        tmp_path = path.with_name(path.name + ".tmp.npz")
+        np.savez(
+            tmp_path,
+            vocab=np.array(self.vocab, dtype=str),
+            tokens=self.tokens,
+            offsets=self.offsets,
+            meta=np.array(json.dumps(meta)),
+        )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path=TOKEN_STORE_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(data["vocab"].tolist(), data["tokens"], data["offsets"], meta["fields"], meta.get("corpus_version"))
+
+def concat_stores(stores, fields=FIELDS):
+    """Merges stores (e.g. per-chunk ones) into one with a shared vocabulary."""
+    index = {}
+    token_blocks = []
+    offset_blocks = [np.zeros(1, dtype=np.int64)]
+    total = 0
+    for store in stores:
+        remap = np.fromiter((index.setdefault(w, len(index)) for w in store.vocab), dtype=np.int32, count=len(store.vocab))
+        token_blocks.append(remap[store.tokens])
+        offset_blocks.append(store.offsets[1:] + total)
+        total += len(store.tokens)
+    tokens = np.concatenate(token_blocks) if token_blocks else np.empty(0, dtype=np.int32)
+    return TokenStore(list(index), tokens, np.concatenate(offset_blocks), fields)
+
+def _interleave(blocks, lengths):
+    """
+    Merges token arrays into row-major order. `blocks[j]` holds the tokens
+    of block j for every row in row order, and `lengths[i, j]` says how many
+    belong to row i, so the result is row 0's blocks, then row 1's, etc.
+    """
+    import pyarrow as pa
+
+    n_rows, n_blocks = lengths.shape
+    offsets = np.zeros(lengths.size + 1, dtype=np.int64)
+    np.cumsum(lengths.ravel(), out=offsets[1:])
+    positions = []
+    for j in range(n_blocks):
+        local = np.concatenate(([0], np.cumsum(lengths[:, j])[:-1]))
+        starts = offsets[np.arange(n_rows) * n_blocks + j]
+        positions.append(np.repeat(starts - local, lengths[:, j]) + np.arange(lengths[:, j].sum()))
+    order = np.empty(offsets[-1], dtype=np.int64)
+    order[np.concatenate(positions)] = np.arange(offsets[-1])
+    return pa.concat_arrays(blocks).take(pa.array(order)), offsets
+
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+_WORD_CHAR_RE = re.compile(r"\w")
+_ascii_stand_ins = {}
+
+def _ascii_stand_in(match):
+    # A non-ASCII word character can only spoil a token, like "_"; anything
+    # else separates tokens, like a space
+    char = match.group()
+    if char not in _ascii_stand_ins:
+        _ascii_stand_ins[char] = "_" if _WORD_CHAR_RE.match(char) else " "
+    return _ascii_stand_ins[char]
+
+# Everything that is not an ASCII word character becomes a separator
+_SEPARATE = str.maketrans({
+    chr(i): chr(i) if chr(i).isascii() and (chr(i).isalnum() or chr(i) == "_") else " " for i in range(128)
+})
+
+def _tokenize_texts(values):
+    """
+    Tokenizes a column of text values, returning (tokens, lengths).
+
+    Texts are lower-cased with Python and made ASCII by standing in for
+    each non-ASCII character, which keeps the tokens `_TOKEN_RE` finds
+    unchanged. On ASCII text a 3+ letter run between word boundaries
+    is exactly a maximal [a-z0-9_] run made only of letters, so after
+    turning every other character into a space, Arrow can split and filter
+    the whole column in one pass.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    texts = [as_text(v).lower() for v in values]
+    texts = [(t if t.isascii() else _NON_ASCII_RE.sub(_ascii_stand_in, t)).translate(_SEPARATE) for t in texts]
+    parts = pc.ascii_split_whitespace(pa.array(texts, type=pa.string()))
+    words = pc.list_flatten(parts)
+    keep = pc.and_(pc.greater_equal(pc.binary_length(words), 3), pc.ascii_is_alpha(words))
+    parents = pc.list_parent_indices(parts).to_numpy()[keep.to_numpy(zero_copy_only=False)]
+    return words.filter(keep), np.bincount(parents, minlength=len(texts)).astype(np.int64)
+
+def _tokenize_terms(values):
+    import pyarrow as pa
+    rows = [tokenize_terms(v) for v in values]
+    return pa.array([t for terms in rows for t in terms], type=pa.string()), np.array([len(t) for t in rows], dtype=np.int64)
+
+def tokenize_frame(df, fields=FIELDS):
+    """Tokenizes every row of `df` into a store (missing columns are empty)."""
+    from ..pipeline.profiling import span
+
+    with span("tokenize_frame", rows=len(df)) as s:
+        store = _tokenize_frame(df, fields)
+        s["tokens"] = len(store.tokens)
+    return store
+
+def _tokenize_frame(df, fields):
+    import pyarrow.compute as pc
+
+    blocks = []
+    lengths = np.zeros((len(df), len(fields)), dtype=np.int64)
+    for j, field in enumerate(fields):
+        values = df[field].tolist() if field in df.columns else [None] * len(df)
+        tokens, lengths[:, j] = _tokenize_texts(values) if field in TEXT_FIELDS else _tokenize_terms(values)
+        blocks.append(tokens)
+    tokens, offsets = _interleave(blocks, lengths)
+    encoded = pc.dictionary_encode(tokens)
+    return TokenStore(
+        encoded.dictionary.to_pylist(),
+        encoded.indices.to_numpy(zero_copy_only=False).astype(np.int32),
+        offsets,
+        fields,
+    )
+
+@contextmanager
+def token_store_writer(path=TOKEN_STORE_PATH, corpus_path=CORPUS_PATH):
+    """
+    Yields an `add(store)` function collecting per-chunk stores. On exit
+    they are merged and saved, stamped with the version of `corpus_path`,
+    so open this before the corpus writer that produces that file.
+    """
+    chunks = []
+    yield chunks.append
+    concat_stores(chunks).save(path, corpus_version=corpus_version(corpus_path))
+
+def load_token_store(path=TOKEN_STORE_PATH, corpus_path=CORPUS_PATH):
+    """
+    Loads the token store for the current corpus, rebuilding it from the
+    corpus when it is missing or was built for a different version.
+    """
+    version = corpus_version(corpus_path)
+    if Path(path).exists():
+        store = TokenStore.load(path)
+        if store.corpus_version == version and store.fields == FIELDS:
+            return store
+    store = concat_stores(tokenize_frame(chunk) for chunk in iter_corpus(corpus_path, columns=list(FIELDS)))
+    store.save(path, corpus_version=version)
+    return store
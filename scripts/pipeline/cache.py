@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+# Stage results keyed by a hash of their inputs and parameters
+CACHE_DIR = Path("data_sources/cache")
+MAX_CACHE_MB = 1024
+
+def _canonical(value):
+    """A JSON-able form of `value` that does not depend on set/dict ordering."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, "tolist"):
+        return _canonical(value.tolist())
+    return repr(value)
+
+def fingerprint(*parts):
+    """Hex digest of `parts` (strings, numbers, lists, dicts, sets)."""
+    payload = json.dumps(_canonical(list(parts)), sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+def file_fingerprint(path):
+    from ..load.corpus_store import corpus_version
+    return corpus_version(path)
+
+def graph_fingerprint(G):
+    """Fingerprint of a graph's nodes, edges and their attributes."""
+    nodes = sorted((str(n), _canonical(attrs)) for n, attrs in G.nodes(data=True))
+    edges = sorted(sorted((str(u), str(v))) + [_canonical(attrs)] for u, v, attrs in G.edges(data=True))
+    return fingerprint(nodes, edges)
+
+class ArtifactCache:
+    """
+    On-disk memo of stage results, one pickle per key.
+
+    A key hashes the stage name with fingerprints of everything the result
+    depends on, so a changed input or parameter is simply a different key.
+    Hits refresh the entry's mtime and, once the directory grows past
+    `max_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_CACHE_MB * 1024 * 1024, enabled=True):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._lock = threading.Lock()
+
+    def key(self, stage, *parts):
+        return f"{stage}-{fingerprint(stage, *parts)}"
+
+    def _path(self, key):
+        return self.root / f"{key}.pkl"
+
+    def get(self, key):
+        """Returns (found, value)."""
+        path = self._path(key)
+        try:
+            with path.open("rb") as f:
+                value = pickle.load(f)
+        except Exception:
+            # Missing, truncated, or pickled against code that has since changed
+            return False, None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another thread after the load; the value is still good
+            pass
+        return True, value
+
+    def put(self, key, value):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(path)
+        self.evict()
+
+    def evict(self):
+        """Drops least recently used entries until the cache fits `max_bytes`."""
+        with self._lock:
+            entries = []
+            for path in self.root.glob("*.pkl"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def cached(self, stage, parts, compute):
+        """
+        Returns the cached result for `stage` with inputs `parts`, calling
+        `compute()` and storing its result on a miss.
+        """
+        if not self.enabled:
+            return compute()
+        key = self.key(stage, *parts)
+        found, value = self.get(key)
+        with self._lock:
+            self.stats[stage]["hits" if found else "misses"] += 1
+        if found:
+            print(f"♻️ {stage}: cache hit")
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def size(self):
+        return sum(path.stat().st_size for path in self.root.glob("*.pkl")) if self.root.exists() else 0
+
+    def report(self):
+        if not self.stats:
+            return
+        hits = sum(s["hits"] for s in self.stats.values())
+        misses = sum(s["misses"] for s in self.stats.values())
+        print(f"📦 Artifact cache: {hits} hits, {misses} misses ({self.size() / 1e6:.1f} MB in {self.root})")
+        for stage, s in sorted(self.stats.items()):
+            print(f"  {stage}: {s['hits']} hits, {s['misses']} misses")
+
+_default_cache = None
+
+def default_cache():
+    """
+    The process-wide cache. ARTIFACT_CACHE=0 disables it and
+    ARTIFACT_CACHE_MB sets its size bound.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ArtifactCache(
+            max_bytes=int(os.environ.get("ARTIFACT_CACHE_MB", MAX_CACHE_MB)) * 1024 * 1024,
+            enabled=os.environ.get("ARTIFACT_CACHE", "1") != "0",
+        )
+    return _default_cache
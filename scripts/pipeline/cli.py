@@ -0,0 +1,96 @@
+"""
+Command line entry point for the review pipeline.
+
+    python main.py                  # everything
+    python main.py screen           # deduplicate and screen into the corpus
+    python main.py prisma           # PRISMA counts and flow CSV
+    python main.py keywords         # keyword clusters and bar chart
+    python main.py map              # interactive keyword map
+    python main.py authors          # co-authorship map
+    python main.py sweep --k 4 6 8 10 --seeds 42 7   # compare clusterings
+
+Each command runs only its stages of the pipeline DAG, and stages import
+their libraries when they run, so e.g. `prisma` never loads pandas,
+scikit-learn or plotting libraries. Commands reuse the screened corpus and
+PRISMA ledger when they exist; --rescreen runs screening again first.
+"""
+import argparse
+import os
+from pathlib import Path
+
+# Pipeline targets per command (None: every stage)
+COMMANDS = {
+    "all": None,
+    "screen": ["clean"],
+    "prisma": ["prisma_csv"],
+    "keywords": ["keyword_clusters", "keyword_chart"],
+    "map": ["keyword_map"],
+    "authors": ["author_map"],
+    "sweep": ["tokens"],
+}
+
+def _existing_clean():
+    """The clean stage's artifact for a corpus screened earlier, or None."""
+    from ..analysis.prisma_ledger import LEDGER_PATH
+    from ..load.corpus_store import CORPUS_PATH
+    if Path(CORPUS_PATH).exists() and LEDGER_PATH.exists():
+        return {"corpus_path": CORPUS_PATH}
+    return None
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", nargs="?", default="all", choices=list(COMMANDS))
+    parser.add_argument("--stages", nargs="+", metavar="STAGE", help="Run these pipeline stages instead")
+    parser.add_argument("--rescreen", action="store_true", help="Screen again even if a corpus exists")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every cached stage")
+    parser.add_argument("--refit", action="store_true", help="Refit keyword clusters instead of assigning to the saved model")
+    parser.add_argument("--headless", action="store_true", help="Write figures to files instead of opening windows")
+    parser.add_argument("--output-dir", help="Directory for headless figures (implies --headless)")
+    parser.add_argument("--profile", action="store_true", help="Record per-stage time and memory to a Chrome trace")
+    parser.add_argument("--profile-stage", metavar="NAME[,NAME]", help="Also run these stages under cProfile")
+    parser.add_argument("--workers", type=int, help="Stages run concurrently (default 4); sweep: fitting processes (default: one per core)")
+    parser.add_argument("--clusters", metavar="N|auto", help="Keyword clusters to make, or auto to choose by silhouette")
+    parser.add_argument("--k", type=int, nargs="+", help="sweep: cluster counts to try")
+    parser.add_argument("--seeds", type=int, nargs="+", help="sweep: KMeans seeds to try")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.headless or args.output_dir:
+        from ..visualize.render import set_render_mode
+        set_render_mode(files=True, output_dir=args.output_dir)
+    if args.profile_stage:
+        os.environ["PIPELINE_PROFILE_STAGES"] = args.profile_stage
+    if args.profile:
+        from . import profiling
+        profiling.enable()
+
+    if args.refit:
+        from . import stages
+        stages.FORCE_REFIT = True
+    if args.clusters:
+        from . import stages
+        stages.N_CLUSTERS = args.clusters if args.clusters == "auto" else int(args.clusters)
+
+    targets = args.stages or COMMANDS[args.command]
+    provided = None
+    if targets is not None and "clean" not in targets and not args.rescreen:
+        clean = _existing_clean()
+        if clean is not None:
+            print(f"Using the screened corpus at {clean['corpus_path']} (--rescreen to redo)")
+            provided = {"clean": clean}
+
+    try:
+        if args.command == "sweep" and not args.stages:
+            from .stages import SWEEP_K, SWEEP_SEEDS, sweep
+            return sweep(args.k or SWEEP_K, args.seeds or SWEEP_SEEDS, use_cache=not args.no_cache, provided=provided, workers=args.workers)
+
+        from .stages import run
+        return run(targets=targets, max_workers=args.workers or 4, use_cache=not args.no_cache, provided=provided)
+    finally:
+        # After the whole command, so work outside the DAG (the sweep) is in the trace
+        from . import profiling
+        if profiling.enabled():
+            profiling.print_summary()
+            print(f"Trace saved to {profiling.write_trace()}")
@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Chrome trace of the last profiled run (open in chrome://tracing or Perfetto)
+TRACE_PATH = "data_sources_raw/logs/pipeline_trace.json"
+PROFILE_DIR = "data_sources_raw/logs/profiles"
+
+_events = []
+_lock = threading.Lock()
+_enabled = os.environ.get("PIPELINE_PROFILE", "0") not in ("", "0")
+
+def enable(on=True):
+    """Turns profiling on for this process and the workers it starts."""
+    global _enabled
+    _enabled = on
+    os.environ["PIPELINE_PROFILE"] = "1" if on else "0"
+
+def enabled():
+    return _enabled
+
+def profiled_stages():
+    """Stages to run under cProfile, from PIPELINE_PROFILE_STAGES (comma separated)."""
+    return {s.strip() for s in os.environ.get("PIPELINE_PROFILE_STAGES", "").split(",") if s.strip()}
+
+def _rss_mb():
+    """Current resident set size, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if os.uname().sysname == "Darwin" else peak / 2**10
+
+@contextmanager
+def span(name, category="step", **counts):
+    """
+    Times the enclosed block as one trace event: wall and CPU time of this
+    thread, RSS before/after and the process's peak RSS. Yields a dict for
+    item counts (`s["rows"] = n`), stored with the event. A no-op unless
+    profiling is enabled.
+    """
+    if not _enabled:
+        yield counts
+        return
+    rss_before = _rss_mb()
+    cpu_start = time.thread_time()
+    start = time.perf_counter()
+    try:
+        yield counts
+    finally:
+        wall = time.perf_counter() - start
+        cpu = time.thread_time() - cpu_start
+        rss_after = _rss_mb()
+        args = {
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "rss_mb": None if rss_after is None else round(rss_after, 1),
+            "rss_delta_mb": None if rss_after is None or rss_before is None else round(rss_after - rss_before, 1),
+            "peak_rss_mb": _peak_rss_mb(),
+            **counts,
+        }
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            # perf_counter is system-wide monotonic, so worker events line up
+            "ts": round(start * 1e6),
+            "dur": round(wall * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        with _lock:
+            _events.append(event)
+
+@contextmanager
+def maybe_cprofile(name):
+    """Runs the block under cProfile if `name` is in PIPELINE_PROFILE_STAGES."""
+    if name not in profiled_stages():
+        yield
+        return
+    import cProfile
+    import pstats
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        path = Path(PROFILE_DIR) / f"{name}.prof"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(path)
+        print(f"🔬 cProfile for {name} saved to {path} (snakeviz / pstats); top entries:")
+        pstats.Stats(profile).sort_stats("cumulative").print_stats(15)
+
+def events():
+    with _lock:
+        return list(_events)
+
+def take_events():
+    """Returns and clears the recorded events (used to ship them from workers)."""
+    with _lock:
+        taken = list(_events)
+        _events.clear()
+    return taken
+
+def add_events(new_events):
+    with _lock:
+        _events.extend(new_events)
+
+def summary():
+    """Stage events as {name: args}, in start order."""
+    return {e["name"]: e["args"] for e in sorted(events(), key=lambda e: e["ts"]) if e["cat"] == "stage"}
+
+def write_trace(path=TRACE_PATH):
+    """Writes the recorded events in Chrome trace format; returns the path."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    threads = sorted({(e["pid"], e["tid"]) for e in events()})
+    names = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": f"thread-{i}"}}
+             for i, (pid, tid) in enumerate(threads)]
+    with path.open("w", encoding="utf-8") as f:
+        json.dump({"traceEvents": names + events(), "displayTimeUnit": "ms"}, f, indent=1)
+    return str(path)
+
+def print_summary():
+    print("⏱️ Stage profile (wall s / cpu s / peak RSS MB):")
+    for name, args in summary().items():
+        extra = {k: v for k, v in args.items() if k not in ("wall_s", "cpu_s", "rss_mb", "rss_delta_mb", "peak_rss_mb")}
+        counts = ", ".join(f"{k}={v}" for k, v in extra.items())
+        print(f"  {name:<20} {args['wall_s']:8.2f} {args['cpu_s']:8.2f} {args['peak_rss_mb'] or 0:8.0f}  {counts}")
@@ -0,0 +1,127 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from .profiling import maybe_cprofile, span
+
+class Stage:
+    """
+    One step of a pipeline DAG.
+
+    `func` is called with the results of `deps` as keyword arguments (named
+    after the dependency stages) and its return value is the stage's
+    artifact. Stages that open windows (matplotlib, plotly) should set
+    `main_thread`, since GUI backends only work there. A failing `optional`
+    stage only skips its dependents; any other failure stops the run.
+    """
+
+    def __init__(self, name, func, deps=(), main_thread=False, optional=False):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.main_thread = main_thread
+        self.optional = optional
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, deps={list(self.deps)})"
+
+class PipelineError(RuntimeError):
+    pass
+
+def _required(stages, targets, provided=()):
+    """The target stages and everything they depend on, up to `provided` ones."""
+    needed = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name in needed or name in provided:
+            continue
+        if name not in stages:
+            raise PipelineError(f"Unknown stage: {name}")
+        needed.add(name)
+        todo.extend(stages[name].deps)
+    return needed
+
+def run_pipeline(stages, targets=None, max_workers=4, provided=None):
+    """
+    Runs `stages` (a list of Stage) in dependency order in this process.
+
+    Stages whose dependencies are done run concurrently in a thread pool,
+    so independent branches overlap; main-thread stages run here while the
+    pool keeps working. Artifacts are handed between stages in memory.
+    With `targets`, only those stages and their dependencies run.
+    `provided` maps stage names to artifacts that already exist (e.g. a
+    corpus cleaned earlier); those stages are not run.
+
+    Returns {stage name: artifact} for the stages that completed.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    if len(by_name) != len(stages):
+        raise PipelineError("Stage names must be unique")
+    provided = dict(provided or {})
+    needed = _required(by_name, targets if targets is not None else by_name, provided)
+    for stage in by_name.values():
+        missing = [d for d in stage.deps if d not in by_name]
+        if missing:
+            raise PipelineError(f"{stage.name} depends on unknown stages: {missing}")
+
+    pending = {name: by_name[name] for name in by_name if name in needed}
+    results = dict(provided)
+    failed = {}
+    skipped = set()
+    running = {}
+    started = {}
+
+    def finish(name, error=None, value=None):
+        elapsed = time.perf_counter() - started[name]
+        if error is None:
+            results[name] = value
+            print(f"✅ {name} ({elapsed:.1f}s)")
+            return
+        failed[name] = error
+        print(f"❌ {name} failed after {elapsed:.1f}s: {error}")
+
+    def call(stage):
+        with span(stage.name, category="stage"), maybe_cprofile(stage.name):
+            return stage.func(**{dep: results[dep] for dep in stage.deps})
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            halted = any(not by_name[name].optional for name in failed)
+
+            # Anything downstream of a failure is skipped
+            for name, stage in list(pending.items()):
+                if halted or any(dep in failed or dep in skipped for dep in stage.deps):
+                    skipped.add(name)
+                    del pending[name]
+
+            ready = [stage for stage in pending.values() if all(dep in results for dep in stage.deps)]
+            for stage in ready:
+                if not stage.main_thread:
+                    del pending[stage.name]
+                    started[stage.name] = time.perf_counter()
+                    running[pool.submit(call, stage)] = stage.name
+
+            main_ready = [stage for stage in ready if stage.main_thread]
+            if main_ready:
+                stage = main_ready[0]
+                del pending[stage.name]
+                started[stage.name] = time.perf_counter()
+                try:
+                    finish(stage.name, value=call(stage))
+                except Exception as e:
+                    finish(stage.name, error=e)
+            elif running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    finish(name, error=error, value=None if error else future.result())
+            elif pending:
+                raise PipelineError(f"Dependency cycle among: {sorted(pending)}")
+
+    if skipped:
+        print(f"Skipped: {', '.join(sorted(skipped))}")
+    fatal = {name: e for name, e in failed.items() if not by_name[name].optional}
+    if fatal:
+        name, error = next(iter(fatal.items()))
+        raise PipelineError(f"Stage {name} failed") from error
+    return results
@@ -0,0 +1,274 @@
+from collections import Counter
+from pathlib import Path
+from . import profiling
+from .cache import default_cache, file_fingerprint, fingerprint, graph_fingerprint
+from .runner import Stage, run_pipeline
+from ..visualize.render import headless, render, shutdown_render_pool
+
+# Logs rebuilt from scratch by every full run
+LOG_DIR = Path("data_sources_raw/logs")
+RESET_LOGS = [LOG_DIR / "prisma_counts.json", LOG_DIR / "prisma_decisions.jsonl"]
+
+RIS_PATH = "data_sources/raw/mendeley_export.ris"
+KEYWORD_FIELDS = ["title", "abstract", "keywords", "subject_area"]
+N_CLUSTERS = 8  # or "auto" to choose from select_k.K_RANGE
+KEYWORD_CLUSTERING = "kmeans"  # kmeans, svd (TF-IDF + TruncatedSVD first) or streaming (MiniBatchKMeans, chunk by chunk)
+SVD_COMPONENTS = 200
+# Keep the fitted cluster model and assign later corpora to it until drift calls for a refit
+KEYWORD_MODEL = True
+FORCE_REFIT = False
+MIN_TERM_FREQ = 5
+LAYOUT_TYPE = "kamada"  # spring or kamada or circular or spectral
+SWEEP_K = [4, 6, 8, 10, 12]
+SWEEP_SEEDS = [42]
+
+def reset_logs():
+    from ..analysis.prisma_ledger import LEDGER_PATH, reset_ledger
+    for path in RESET_LOGS:
+        if path.exists():
+            path.unlink()
+            print(f"Reset: {path.name}")
+    if LEDGER_PATH.exists():
+        reset_ledger()
+        print(f"Reset: {LEDGER_PATH.name}")
+
+def clean():
+    from ..clean.clean_data import clean_workers, run_clean
+    reset_logs()
+    summary = run_clean(workers=clean_workers())
+    if summary is None:
+        raise FileNotFoundError("clean_data found no input metadata")
+    return summary
+
+def prisma_counts(clean):
+    from ..analysis.count_prisma_stages import count_prisma_stages
+    return count_prisma_stages()
+
+def prisma_csv(prisma_counts):
+    from ..analysis.generate_prisma_csv import generate_csv
+    return generate_csv(counts=prisma_counts)
+
+def tokens(clean):
+    from ..load.token_store import load_token_store
+    # Written by clean_data alongside the corpus, so this is a plain load
+    return load_token_store(corpus_path=clean["corpus_path"])
+
+def keyword_clusters(clean, tokens):
+    from ..analysis.cluster_keywords import cluster_keywords, fit_keyword_svd, stream_cluster_keywords
+    from ..analysis.cluster_model import assign_corpus, current_version, load_model, save_model
+    from ..analysis.name_clusters import name_clusters
+    from ..load.corpus_store import corpus_columns
+    from ..load.nlp_resources import STOP_WORDS
+
+    columns = corpus_columns(clean["corpus_path"])
+    fields = [col for col in KEYWORD_FIELDS if col in columns]
+    settings = {
+        "fields": fields,
+        "n_clusters": N_CLUSTERS,
+        "clustering": KEYWORD_CLUSTERING,
+        "svd_components": SVD_COMPONENTS,
+        "stop_words": fingerprint(STOP_WORDS),
+    }
+
+    saved = {}
+
+    def compute():
+        if KEYWORD_CLUSTERING == "streaming":
+            clusters = stream_cluster_keywords(token_store=tokens, fields=fields, n_clusters=N_CLUSTERS)
+            term_freq = Counter(tokens.term_counts(fields, exclude=STOP_WORDS))
+        else:
+            model = load_model() if KEYWORD_MODEL and not FORCE_REFIT else None
+            if model is not None and model.get("settings") == settings:
+                # Same settings: place the documents in the saved clusters, keeping IDs, names and colors
+                clusters, report = assign_corpus(model, tokens, fields)
+                print(f"📐 Cluster model {model['version']} drift: {report}")
+                if not report["refit"]:
+                    term_freq = Counter(tokens.term_counts(fields, exclude=STOP_WORDS))
+                    return {"clusters": clusters, "names": model["names"], "colors": model["colors"], "term_freq": term_freq}
+                print("Drift past the limits: refitting the keyword clusters")
+
+            svd = None
+            if KEYWORD_CLUSTERING == "svd":
+                # Cached apart from the clusters, so e.g. a new N_CLUSTERS reuses it
+                svd = default_cache().cached(
+                    "keyword_svd",
+                    [tokens.corpus_version, fields, SVD_COMPONENTS, fingerprint(STOP_WORDS)],
+                    lambda: fit_keyword_svd(token_store=tokens, fields=fields, n_components=SVD_COMPONENTS),
+                )
+            clusters, filtered_lists, model = cluster_keywords(
+                token_store=tokens, fields=fields, n_clusters=N_CLUSTERS, return_tokens=True,
+                engine="svd" if svd else "counts", svd=svd, return_model=True,
+            )
+            # Global term frequency from the filtered tokens
+            term_freq = Counter(kw for token_list in filtered_lists for kw in token_list)
+        cluster_names, cluster_colors = name_clusters(clusters)
+        if KEYWORD_MODEL and KEYWORD_CLUSTERING != "streaming":
+            saved["version"] = save_model(
+                model, settings=settings, fields=fields, corpus_version=tokens.corpus_version,
+                names=cluster_names, colors=cluster_colors,
+            )
+        return {"clusters": clusters, "names": cluster_names, "colors": cluster_colors, "term_freq": term_freq}
+
+    cache = default_cache()
+    result = cache.cached(
+        "keyword_clusters",
+        [tokens.corpus_version, settings, KEYWORD_MODEL and not FORCE_REFIT and current_version()],
+        compute,
+    )
+    if saved and cache.enabled:
+        # The next run keys on the model just saved, and assigning the same
+        # corpus to it reproduces this result, so store it under that key too
+        cache.put(cache.key("keyword_clusters", tokens.corpus_version, settings, saved["version"]), result)
+    print(f"Raw cluster count: {len(result['clusters'])}")
+    return result
+
+def keyword_chart(keyword_clusters):
+    return render("scripts.visualize.plot_keywords:plot_keyword_bar_chart", keyword_clusters["clusters"], keyword_clusters["names"])
+
+def keyword_graph(keyword_clusters):
+    import networkx as nx
+    from ..visualize.vosmapper.build_graph import build_graph
+
+    clusters = keyword_clusters["clusters"]
+    term_freq = Counter(keyword_clusters["term_freq"])
+    with profiling.span("build_graph") as s:
+        G = build_graph(clusters, keyword_clusters["names"])
+        s["nodes"], s["edges"] = G.number_of_nodes(), G.number_of_edges()
+
+    # Filter nodes (frequency threshold + fallback inclusion)
+    visible_nodes = {n for n in G.nodes() if term_freq.get(n, 0) >= MIN_TERM_FREQ}
+
+    # Ensure at least one node per cluster is retained
+    for keywords in clusters.values():
+        fallback_nodes = [node for node, _ in keywords if node in G.nodes() and node not in visible_nodes]
+        if fallback_nodes:
+            visible_nodes.add(fallback_nodes[0])
+
+    # Ensure every visible node has a frequency entry
+    for node in visible_nodes:
+        term_freq.setdefault(node, 1)
+
+    G = G.subgraph(visible_nodes).copy()
+    term_freq = {k: v for k, v in term_freq.items() if k in visible_nodes}
+
+    # Tag isolated nodes (no edges)
+    for node in G.nodes():
+        if nx.degree(G, node) == 0:
+            G.nodes[node]["isolated"] = True
+    return {"graph": G, "term_freq": term_freq}
+
+def keyword_layout(keyword_graph):
+    from ..visualize.vosmapper.compute_layout import compute_layout
+    G = keyword_graph["graph"]
+
+    def compute():
+        with profiling.span("compute_layout", nodes=G.number_of_nodes(), layout=LAYOUT_TYPE):
+            return compute_layout(G, layout_type=LAYOUT_TYPE)
+
+    return default_cache().cached("keyword_layout", [graph_fingerprint(G), LAYOUT_TYPE], compute)
+
+def keyword_map(keyword_clusters, keyword_graph, keyword_layout):
+    return render(
+        "scripts.visualize.vosmapper.plot_interactive:plot_interactive",
+        keyword_graph["graph"],
+        keyword_graph["term_freq"],
+        keyword_layout,
+        sizing_mode="frequency",  # "frequency" or "co-occurrence"
+        cluster_colors=keyword_clusters["colors"],
+        strong_edge_scale=0.5,
+        weak_edge_scale=0.5,
+        edge_threshold=0.1
+    )
+
+def author_entries():
+    from ..analysis.co_author.launch_author_pipeline import load_author_entries
+    entries = load_author_entries(RIS_PATH)
+    if entries is None:
+        raise ValueError(f"No entries parsed from {RIS_PATH}")
+    return {"entries": entries, "ris_version": file_fingerprint(RIS_PATH)}
+
+def author_matrix(author_entries):
+    from ..analysis.co_author.build_author_matrix import build_author_matrix
+    def compute():
+        with profiling.span("build_author_matrix", entries=len(author_entries["entries"])) as s:
+            matrix = build_author_matrix(author_entries["entries"])
+            s["authors"] = len(matrix)
+        return matrix
+
+    return default_cache().cached("author_matrix", [author_entries["ris_version"]], compute)
+
+def author_embeddings(author_entries):
+    from ..analysis.co_author import build_author_topics as bat
+    def compute():
+        with profiling.span("build_author_embeddings", model=bat.MODEL_NAME) as s:
+            embeddings = bat.build_author_embeddings(author_entries["entries"], model_name=bat.MODEL_NAME)
+            s["authors"] = len(embeddings)
+        return embeddings
+
+    return default_cache().cached("author_embeddings", [author_entries["ris_version"], bat.MODEL_NAME], compute)
+
+def author_graph(author_entries, author_matrix, author_embeddings):
+    from ..analysis.co_author.launch_author_pipeline import assemble_author_graph
+    return assemble_author_graph(author_entries["entries"], author_matrix, author_embeddings)
+
+def author_map(author_graph):
+    return render("scripts.analysis.co_author.visualize_author_map:visualize_author_graph", author_graph)
+
+def build_stages():
+    """
+    The review pipeline as a DAG. The author branch only reads the RIS
+    export, so it runs alongside cleaning and clustering; it is optional,
+    as a failure there should not stop the keyword map. Clustering, the
+    layout, the co-author matrix and the embeddings go through the artifact
+    cache, so unchanged inputs and parameters are not recomputed.
+
+    Figures open windows, so they are drawn on the main thread, unless
+    running headless: then they are written to files from worker
+    processes, in parallel with each other and the remaining stages.
+    """
+    on_screen = not headless()
+    return [
+        Stage("clean", clean),
+        Stage("prisma_counts", prisma_counts, deps=["clean"]),
+        Stage("prisma_csv", prisma_csv, deps=["prisma_counts"]),
+        Stage("tokens", tokens, deps=["clean"]),
+        Stage("keyword_clusters", keyword_clusters, deps=["clean", "tokens"]),
+        Stage("keyword_chart", keyword_chart, deps=["keyword_clusters"], main_thread=on_screen),
+        Stage("keyword_graph", keyword_graph, deps=["keyword_clusters"]),
+        Stage("keyword_layout", keyword_layout, deps=["keyword_graph"]),
+        Stage("keyword_map", keyword_map, deps=["keyword_clusters", "keyword_graph", "keyword_layout"], main_thread=on_screen),
+        Stage("author_entries", author_entries, optional=True),
+        Stage("author_matrix", author_matrix, deps=["author_entries"], optional=True),
+        Stage("author_embeddings", author_embeddings, deps=["author_entries"], optional=True),
+        Stage("author_graph", author_graph, deps=["author_entries", "author_matrix", "author_embeddings"], optional=True),
+        Stage("author_map", author_map, deps=["author_graph"], main_thread=on_screen, optional=True),
+    ]
+
+def run(targets=None, max_workers=4, use_cache=True, provided=None):
+    cache = default_cache()
+    enabled = cache.enabled
+    cache.enabled = enabled and use_cache
+    try:
+        return run_pipeline(build_stages(), targets=targets, max_workers=max_workers, provided=provided)
+    finally:
+        cache.enabled = enabled
+        shutdown_render_pool()
+        cache.report()
+
+def sweep(k_values=SWEEP_K, seeds=SWEEP_SEEDS, max_workers=4, use_cache=True, provided=None, workers=None):
+    """
+    Loads the tokenized corpus through the pipeline, then fits every
+    (k, seed) on its keyword matrix in `workers` processes (default: one
+    per core) and prints the comparison table.
+    """
+    from ..analysis.cluster_keywords import sweep_clusters
+    from ..analysis.select_k import print_curve
+    from ..load.corpus_store import corpus_columns
+
+    results = run(targets=["tokens"], max_workers=max_workers, use_cache=use_cache, provided=provided)
+    columns = corpus_columns(results["clean"]["corpus_path"])
+    fields = [col for col in KEYWORD_FIELDS if col in columns]
+    with profiling.span("keyword_sweep", category="stage", fits=len(k_values) * len(seeds)):
+        rows = sweep_clusters(token_store=results["tokens"], fields=fields, k_values=k_values, seeds=seeds, workers=workers)
+    print_curve(rows)
+    return rows
@@ -1,9 +1,12 @@
 import matplotlib.pyplot as plt
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
-from sentence_transformers import SentenceTransformer
+from .render import show_figure
+
+def plot_clusters(df, n_clusters=5, output_name="abstract_clusters"):
+    # The embedding model pulls in torch, so import it only when plotting
+    from sklearn.decomposition import PCA
+    from sklearn.cluster import KMeans
+    from sentence_transformers import SentenceTransformer
 
-def plot_clusters(df, n_clusters=5):
     model = SentenceTransformer("all-MiniLM-L6-v2")
     abstracts = df["abstract"].fillna("").tolist()
     embeddings = model.encode(abstracts)
@@ -33,4 +36,4 @@ def plot_clusters(df, n_clusters=5):
     plt.title("Semantic Landscape of Abstracts")
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    return show_figure(name=output_name)
@@ -1,7 +1,8 @@
 import matplotlib.pyplot as plt
 import seaborn as sns
+from .render import show_figure
 
-def plot_keyword_bar_chart(clusters, cluster_names, cluster_colors=None):
+def plot_keyword_bar_chart(clusters, cluster_names, cluster_colors=None, output_name="keyword_bar_chart"):
     # Flatten data for plotting
     data = []
     for cluster_id, keywords in clusters.items():
@@ -38,4 +39,4 @@ def plot_keyword_bar_chart(clusters, cluster_names, cluster_colors=None):
     plt.xticks(rotation=45, ha="right")
     plt.legend(title="Cluster", bbox_to_anchor=(1.05, 1), loc="upper left")
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    return show_figure(name=output_name)
\ No newline at end of file
@@ -1,8 +1,9 @@
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from .render import show_figure
 
-def plot_theme_clusters(themes_dict):
+def plot_theme_clusters(themes_dict, output_name="theme_clusters"):
     fig, ax = plt.subplots(figsize=(12, 6))
     cmap = plt.get_cmap('tab10')
     # Use a safe approach: prefer `colors` attribute if available, otherwise
@@ -39,4 +40,4 @@ def plot_theme_clusters(themes_dict):
     ax.set_ylabel("Frequency")
     ax.legend()
     plt.tight_layout()
-    plt.show()
+    return show_figure(fig, name=output_name)
@@ -0,0 +1,115 @@
+import os
+import sys
+from pathlib import Path
+
+# Where headless runs write figures, and the formats they are written in
+RENDER_DIR = "data_sources_raw/figures"
+STATIC_FORMATS = ("png", "svg")
+DPI = 150
+
+_pool = None
+
+def headless():
+    """
+    True when figures should be written to files instead of shown:
+    RENDER_MODE=files (or =show to force windows), otherwise whenever no
+    display is attached.
+    """
+    mode = os.environ.get("RENDER_MODE", "").lower()
+    if mode in ("files", "headless"):
+        return True
+    if mode == "show":
+        return False
+    return sys.platform.startswith("linux") and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+def set_render_mode(files=True, output_dir=None):
+    """Selects the render mode for this process and the workers it starts."""
+    os.environ["RENDER_MODE"] = "files" if files else "show"
+    if output_dir:
+        os.environ["RENDER_DIR"] = str(output_dir)
+    if files:
+        # No GUI backend, so rendering never needs a display
+        os.environ["MPLBACKEND"] = "Agg"
+        if "matplotlib" in sys.modules:
+            import matplotlib
+            matplotlib.use("Agg")
+
+def output_path(name, ext):
+    directory = Path(os.environ.get("RENDER_DIR", RENDER_DIR))
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{name}.{ext}"
+
+def show_figure(fig=None, name="figure", formats=STATIC_FORMATS):
+    """
+    Shows a matplotlib figure (the current one by default), or in headless
+    mode saves it as `name` in each format and closes it. Returns the
+    written paths.
+    """
+    import matplotlib.pyplot as plt
+    fig = fig or plt.gcf()
+    if not headless():
+        plt.show()
+        return []
+    paths = []
+    for ext in formats:
+        path = output_path(name, ext)
+        fig.savefig(path, dpi=DPI, bbox_inches="tight")
+        paths.append(str(path))
+    plt.close(fig)
+    print(f"🖼️ Saved {name}: {', '.join(paths)}")
+    return paths
+
+def show_plotly(fig, name="figure"):
+    """Shows a plotly figure, or in headless mode writes it as standalone HTML."""
+    if not headless():
+        fig.show()
+        return []
+    path = output_path(name, "html")
+    fig.write_html(path, include_plotlyjs=True)
+    print(f"🖼️ Saved {name}: {path}")
+    return [str(path)]
+
+def _render_pool(workers=None):
+    global _pool
+    if _pool is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        workers = workers or int(os.environ.get("RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+        # Forking while pipeline threads hold locks can deadlock the child, so
+        # workers start fresh and pick the render mode up from the environment
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+def _resolve(plot):
+    if callable(plot):
+        return plot
+    import importlib
+    module, _, name = plot.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+def _render_in_worker(plot, args, kwargs):
+    from ..pipeline import profiling
+    result = _resolve(plot)(*args, **kwargs)
+    return result, profiling.take_events()
+
+def render(plot, *args, **kwargs):
+    """
+    Calls the plotting function `plot`, a callable or a "module:function"
+    path. In headless mode it runs in a worker process, so figures
+    requested from different threads render in parallel; its arguments
+    must then be picklable. With a path, only the process that draws
+    imports the plotting libraries.
+    """
+    if not headless():
+        return _resolve(plot)(*args, **kwargs)
+    from ..pipeline import profiling
+    result, events = _render_pool().submit(_render_in_worker, plot, args, kwargs).result()
+    # Spans recorded in the worker join this process's trace
+    profiling.add_events(events)
+    return result
+
+def shutdown_render_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
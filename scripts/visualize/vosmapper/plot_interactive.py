@@ -1,6 +1,8 @@
 from collections import defaultdict
 import numpy as np
 import math
+from ..render import show_plotly
+from ...pipeline.profiling import span
 
 def curved_edge(x0, y0, x1, y1, curvature=0.05, resolution=500):
     mx, my = (x0 + x1) / 2, (y0 + y1) / 2
@@ -34,7 +36,8 @@ def plot_interactive(
     cluster_colors=None,
     strong_edge_scale=1.0,
     weak_edge_scale=1.0,
-    edge_threshold=0.05
+    edge_threshold=0.05,
+    output_name="keyword_map"
 ):
     # Import heavy plotting library lazily to avoid importing plotly when
     # this module is imported but interactive plotting is not used.
@@ -155,16 +158,18 @@ def plot_interactive(
 
     sorted_traces = [t for t in traces if t.mode == 'lines'] + [t for t in traces if t.mode != 'lines']
 
-    fig = go.Figure(
-        data=sorted_traces,
-        layout=go.Layout(
-            title=dict(text=sizing_mode, font=dict(size=16)),
-            showlegend=True,
-            hovermode='closest',
-            margin=dict(b=20, l=5, r=5, t=40),
-            xaxis=dict(showgrid=False, zeroline=False),
-            yaxis=dict(showgrid=False, zeroline=False)
+    with span("plot_interactive.figure", traces=len(sorted_traces)):
+        fig = go.Figure(
+            data=sorted_traces,
+            layout=go.Layout(
+                title=dict(text=sizing_mode, font=dict(size=16)),
+                showlegend=True,
+                hovermode='closest',
+                margin=dict(b=20, l=5, r=5, t=40),
+                xaxis=dict(showgrid=False, zeroline=False),
+                yaxis=dict(showgrid=False, zeroline=False)
+            )
         )
-    )
 
-    fig.show()
\ No newline at end of file
+    with span("plot_interactive.output"):
+        return show_plotly(fig, name=output_name)
\ No newline at end of file
@@ -3,10 +3,13 @@ from matplotlib.lines import Line2D
 import networkx as nx
 import seaborn as sns
 import numpy as np
-import alphashape
-from shapely.geometry import Polygon
+from ..render import show_figure
 
 def draw_cluster_shape(ax, pos, nodes, color, alpha=0.2):
+    # Geometry libraries are only needed once a hull is drawn
+    import alphashape  # type: ignore[reportMissingImports]
+    from shapely.geometry import Polygon  # type: ignore[reportMissingImports]
+
     points = np.array([pos[n] for n in nodes])
     if len(points) < 4:
         return
@@ -26,7 +29,7 @@ def bucket_size(freq, scale=0.8):
 def font_size_from_node_size(size):
     return max(6, min(7, int(size / 60)))  # Scales font size between 6 and 7
 
-def plot_vos_map(clusters, cluster_names=None, scale=1.0):
+def plot_vos_map(clusters, cluster_names=None, scale=1.0, output_name="vos_keyword_map"):
     G = nx.Graph()
 
     # Assign consistent colors to unique cluster labels
@@ -123,4 +126,4 @@ def plot_vos_map(clusters, cluster_names=None, scale=1.0):
     plt.title("VOS-style Keyword Map (Enhanced Connectivity & Scaled Labels)")
     plt.axis("off")
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    return show_figure(fig, name=output_name)
\ No newline at end of file